@@ -0,0 +1,224 @@
+"""Micro-benchmark: row packet reading in the Lambda's vendored pymysql.
+
+Replays a synthetic wide x_post result set (the API's SELECT xp.*, l.name,
+s.name with tweet-sized and long TEXT content) from memory through
+Connection._read_packet and MySQLResult row decoding, and reports peak
+scratch memory per row and rows/sec. 'legacy' is pymysql as vendored: packets
+accumulated in a bytearray and copied to bytes, and rows decoded column
+by column through read_length_coded_string. 'copy' reads packets as bytes
+and 'reuse' into the connection's receive buffer, both decoding rows with
+the precompiled row plan. Run from the data/ directory:
+
+    python benchmarks/bench_pymysql_rows.py [num_rows] [content_chars]
+"""
+import io
+import os
+import sys
+import time
+import types
+import struct
+import random
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'lambda', 'flood-alert-api'))
+
+from pymysql.connections import Connection, MySQLResult, MAX_PACKET_LEN, DEBUG
+from pymysql.constants import FIELD_TYPE
+from pymysql.protocol import MysqlPacket
+
+UTF8MB4 = 45
+BINARY = 63
+
+# (name, type, charset) for SELECT xp.*, l.name, s.name
+COLUMNS = [
+    ('x_post_id', FIELD_TYPE.LONG, BINARY),
+    ('source_id', FIELD_TYPE.LONG, BINARY),
+    ('location_id', FIELD_TYPE.LONG, BINARY),
+    ('original_id', FIELD_TYPE.VAR_STRING, UTF8MB4),
+    ('content', FIELD_TYPE.BLOB, UTF8MB4),
+    ('post_time', FIELD_TYPE.DATETIME, BINARY),
+    ('scraped_at', FIELD_TYPE.DATETIME, BINARY),
+    ('url', FIELD_TYPE.VAR_STRING, UTF8MB4),
+    ('sentiment_score', FIELD_TYPE.NEWDECIMAL, BINARY),
+    ('credibility_score', FIELD_TYPE.LONG, BINARY),
+    ('likes_count', FIELD_TYPE.LONG, BINARY),
+    ('retweets_count', FIELD_TYPE.LONG, BINARY),
+    ('replies_count', FIELD_TYPE.LONG, BINARY),
+    ('views_count', FIELD_TYPE.LONG, BINARY),
+    ('name', FIELD_TYPE.VAR_STRING, UTF8MB4),
+    ('name', FIELD_TYPE.VAR_STRING, UTF8MB4),
+]
+
+WORDS = ['banjir', 'flood', 'hujan', 'lebat', 'air', 'naik', 'Sandakan', 'Penampang',
+         'jalan', 'ditutup', 'pusat', 'pemindahan', 'dibuka', '🌧️', '⚠️', 'tolong']
+
+
+def lenenc(value):
+    if value is None:
+        return b'\xfb'
+    if isinstance(value, str):
+        value = value.encode('utf-8')
+    n = len(value)
+    if n < 251:
+        return bytes([n]) + value
+    if n < 2 ** 16:
+        return b'\xfc' + struct.pack('<H', n) + value
+    if n < 2 ** 24:
+        return b'\xfd' + struct.pack('<I', n)[:3] + value
+    return b'\xfe' + struct.pack('<Q', n) + value
+
+
+def field_packet(name, type_code, charset):
+    return (lenenc('def') + lenenc('flood_alert') + lenenc('xp') + lenenc('x_post')
+            + lenenc(name) + lenenc(name)
+            + struct.pack('<BHIBHBxx', 0x0c, charset, 65535, type_code, 0, 0))
+
+
+def make_rows(count, content_chars, seed=7):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        content = ''
+        while len(content) < content_chars:
+            content += rng.choice(WORDS) + ' '
+        rows.append([
+            str(i + 1), '1', str(rng.randint(1, 60)), str(1860000000000000000 + i), content[:content_chars],
+            '2024-12-01 08:15:00', '2024-12-01 08:20:31', f'https://x.com/user/status/{1860000000000000000 + i}',
+            None, '72', str(rng.randint(0, 500)), str(rng.randint(0, 100)), str(rng.randint(0, 50)),
+            str(rng.randint(0, 90000)), 'Sandakan', 'X'
+        ])
+    return rows
+
+
+def result_stream(rows):
+    """Wire bytes for one result set, starting at sequence id 1."""
+    packets = [bytes([len(COLUMNS)])]
+    packets += [field_packet(*column) for column in COLUMNS]
+    packets.append(b'\xfe\x00\x00\x22\x00')
+    packets += [b''.join(lenenc(value) for value in row) for row in rows]
+    packets.append(b'\xfe\x00\x00\x22\x00')
+
+    out = bytearray()
+    for seq, payload in enumerate(packets, 1):
+        assert len(payload) < MAX_PACKET_LEN
+        out += struct.pack('<I', len(payload))[:3] + bytes([seq % 256]) + payload
+    return bytes(out)
+
+
+class _NullSocket:
+    def settimeout(self, timeout):
+        pass
+
+
+def legacy_read_packet(connection, packet_type=MysqlPacket, reuse_buffer=False):
+    """_read_packet as it was: accumulate into a bytearray, then copy to bytes."""
+    buff = bytearray()
+    while True:
+        header = connection._read_bytes(4)
+        btrl, btrh, packet_number = struct.unpack('<HBB', header)
+        bytes_to_read = btrl + (btrh << 16)
+        connection._next_seq_id = (connection._next_seq_id + 1) % 256
+        buff += connection._read_bytes(bytes_to_read)
+        if bytes_to_read < MAX_PACKET_LEN:
+            break
+    packet = packet_type(bytes(buff), connection.encoding)
+    if packet.is_error_packet():
+        packet.raise_for_error()
+    return packet
+
+
+def legacy_read_row(result, packet):
+    """MySQLResult._read_row_from_packet as it was: generic per-column dispatch."""
+    row = []
+    for encoding, converter in result.converters:
+        try:
+            data = packet.read_length_coded_string()
+        except IndexError:
+            break
+        if data is not None:
+            if encoding is not None:
+                data = data.decode(encoding)
+            if DEBUG:
+                print("DEBUG: DATA = ", data)
+            if converter is not None:
+                data = converter(data)
+        row.append(data)
+    return tuple(row)
+
+
+def make_result(connection, mode):
+    result = MySQLResult(connection)
+    if mode == 'legacy':
+        result._read_row_from_packet = types.MethodType(legacy_read_row, result)
+    return result
+
+
+def make_connection(stream, mode):
+    connection = Connection(defer_connect=True, charset='utf8mb4')
+    connection._sock = _NullSocket()
+    connection._rfile = io.BufferedReader(io.BytesIO(stream), buffer_size=64 * 1024)
+    connection._next_seq_id = 1
+    if mode == 'legacy':
+        connection._read_packet = lambda *args, **kwargs: legacy_read_packet(connection, *args, **kwargs)
+    elif mode == 'copy':
+        read_packet = connection._read_packet
+        connection._read_packet = lambda packet_type=MysqlPacket, reuse_buffer=False: read_packet(packet_type)
+    return connection
+
+
+def read_result(stream, mode):
+    connection = make_connection(stream, mode)
+    result = make_result(connection, mode)
+    result.read()
+    return result.rows
+
+
+def measure_allocations(stream, mode, row_count):
+    """Mean and max bytes allocated while reading and decoding each row, beyond the row kept."""
+    connection = make_connection(stream, mode)
+    result = make_result(connection, mode)
+    first = connection._read_packet()
+    result.field_count = first.read_length_encoded_integer()
+    result._get_descriptions()
+
+    rows = []
+    scratch = []
+    tracemalloc.start()
+    for _ in range(row_count):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        packet = connection._read_packet(reuse_buffer=True)
+        rows.append(result._read_row_from_packet(packet))
+        del packet
+        after, peak = tracemalloc.get_traced_memory()
+        scratch.append(peak - after)
+    tracemalloc.stop()
+    return sum(scratch) / len(scratch), max(scratch), rows
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    content_chars = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    rows = make_rows(count, content_chars)
+    stream = result_stream(rows)
+
+    expected = read_result(stream, 'legacy')
+    print(f"{count} rows x {len(COLUMNS)} columns, {len(stream) / count:.0f} wire bytes per row")
+    print('-' * 72)
+    for mode in ('legacy', 'copy', 'reuse'):
+        decoded = read_result(stream, mode)
+        assert decoded == expected, f"{mode} decoded rows differ"
+
+        # Repeat small result sets (the API returns 50 rows) for a stable timing
+        repeats = max(3, 20000 // count)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            read_result(stream, mode)
+        elapsed = (time.perf_counter() - start) / repeats
+
+        mean, worst, _ = measure_allocations(stream, mode, min(count, 2000))
+        print(f"{mode:<8} {count / elapsed:10.0f} rows/s   scratch {mean:8.0f} B/row (max {worst:.0f})")
+
+
+if __name__ == '__main__':
+    main()
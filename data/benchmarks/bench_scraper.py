@@ -0,0 +1,69 @@
+"""Benchmark: end-to-end scraper throughput against the local mock X server.
+
+Starts benchmarks/mock_x_server.py in-process, points XScrapper at it and
+runs a headless scrape per extraction mode, reporting tweets/sec and the
+run metrics (WebDriver calls per tweet, time per phase). Needs Chrome and
+chromedriver but no x.com account. Run from the data/ directory:
+
+    python benchmarks/bench_scraper.py [limit] [modes] [latency]
+
+e.g. python benchmarks/bench_scraper.py 200 script,network 0.2
+"""
+import os
+import sys
+import json
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from mock_x_server import start_server
+from scrape_x import XScrapper
+
+
+def configure_scraper(base_url, cookie_dir):
+    """Point XScrapper at the mock and give it a cookie it will accept."""
+    cookie_file = os.path.join(cookie_dir, 'mock_cookies.json')
+    with open(cookie_file, 'w', encoding='utf-8') as f:
+        json.dump([{'name': 'auth_token', 'value': 'mock', 'path': '/'}], f)
+
+    XScrapper.BASE_URL = base_url
+    XScrapper.SEARCH_URL_TEMPLATE = base_url + 'search?q={q}&src=typed_query&f=live'
+    XScrapper.DEFAULT_DOMAIN = ''
+    XScrapper.COOKIE_FILE = cookie_file
+
+
+def run(mode, limit):
+    with XScrapper(headless=True, block_resources=False) as scraper:
+        tweets = scraper.scrape_tweets(query='(banjir OR flood) Sabah', limit=limit, extraction=mode)
+        summary = scraper.metrics.summary() if scraper.metrics else {}
+    return len(tweets), summary
+
+
+def main():
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    modes = sys.argv[2].split(',') if len(sys.argv) > 2 else ['script', 'webdriver', 'network']
+    latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.2
+
+    server, timeline, base_url = start_server(page_size=20, latency=latency)
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as cookie_dir:
+            configure_scraper(base_url, cookie_dir)
+            for mode in modes:
+                count, summary = run(mode, limit)
+                results.append((mode, count, summary))
+    finally:
+        server.shutdown()
+
+    print()
+    print(f"mock timeline at {base_url}, limit {limit}, {latency:.2f}s per timeline response")
+    print('-' * 78)
+    for mode, count, summary in results:
+        phases = summary.get('phases', {})
+        top = ', '.join(f"{name} {p['seconds']:.1f}s" for name, p in list(phases.items())[:3])
+        print(f"{mode:<10} {count:5d} tweets  {summary.get('tweets_per_second', 0):8.2f} tweets/s  "
+              f"{summary.get('webdriver_calls_per_tweet') or 0:7.2f} calls/tweet  [{top}]")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Benchmark: offline tweet parsing throughput from saved HTML snapshots.
+
+Parses the pages in benchmarks/fixtures (or any directory of saved
+driver.page_source files) with SnapshotTweetParser, in-process and
+across a process pool. Run from the data/ directory:
+
+    python benchmarks/bench_snapshot_parser.py [repeat] [workers] [snapshot_dir]
+"""
+import os
+import sys
+import glob
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from tweet_snapshot import SnapshotTweetParser, parse_snapshot_files
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    snapshot_dir = sys.argv[3] if len(sys.argv) > 3 else FIXTURE_DIR
+
+    paths = sorted(glob.glob(os.path.join(snapshot_dir, '*.html')))
+    if not paths:
+        print(f"No .html snapshots in {snapshot_dir}")
+        sys.exit(1)
+
+    pages = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            pages.append(f.read())
+    size_kb = sum(len(page) for page in pages) / 1024
+    print(f"{len(paths)} snapshots ({size_kb:.0f} KB), repeat={repeat}, workers={workers}")
+    print('-' * 60)
+
+    start = time.perf_counter()
+    tweets = 0
+    for _ in range(repeat):
+        for page in pages:
+            tweets += len(SnapshotTweetParser.parse(page))
+    elapsed = time.perf_counter() - start
+    print(f"{'in-process':<14} {elapsed:7.3f}s  {len(pages) * repeat / elapsed:8.1f} pages/s  "
+          f"{tweets / elapsed:10,.0f} tweets/s")
+
+    start = time.perf_counter()
+    records = parse_snapshot_files(paths * repeat, workers=workers)
+    elapsed = time.perf_counter() - start
+    print(f"{'process pool':<14} {elapsed:7.3f}s  {len(pages) * repeat / elapsed:8.1f} pages/s  "
+          f"{tweets / elapsed:10,.0f} tweets/s  ({len(records)} unique)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,300 @@
+"""Local stand-in for X live search, for scraper benchmarks without x.com.
+
+Serves an infinitely scrolling search page with the markup the scraper
+reads (article[data-testid=tweet], tweetText, User-Name, reply/retweet/like
+groups, analytics link). Tweets are loaded by the page from a
+.../SearchTimeline endpoint in the same GraphQL shape as X, so the
+script, webdriver and network extraction modes all work against it.
+Run from the data/ directory:
+
+    python benchmarks/mock_x_server.py [--port 8800] [--page-size 20]
+        [--latency 0.3] [--rate 0] [--relevant 0.6] [--max-rendered 0]
+
+then point the scraper at it:
+
+    X_BASE_URL=http://127.0.0.1:8800/ X_COOKIE_DOMAIN= python scrape_x.py
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from gazetteer import SABAH_LOCATIONS
+
+
+TIMELINE_PATH = '/i/api/graphql/mock/SearchTimeline'
+
+# Newest tweet of the initial timeline; older tweets count down from it
+TOP_ID = 1_870_000_000_000_000_000
+ID_STEP = 1_000_000_000
+TOP_TIME = datetime(2024, 12, 1, 8, 0, 0, tzinfo=timezone.utc)
+SECONDS_BETWEEN_TWEETS = 45
+
+PLACES = [name.title() for name in SABAH_LOCATIONS if name != 'sabah']
+
+# (lang, text) pairs; X tags Malay posts as 'in'
+FLOOD_TEMPLATES = [
+    ('in', "Banjir kilat di {place}, air naik paras lutut. Jalan utama ditutup buat sementara."),
+    ('in', "Hujan lebat sejak pagi di {place}, penduduk diminta berwaspada #banjir"),
+    ('in', "Pusat pemindahan sementara dibuka di {place} untuk mangsa banjir."),
+    ('in', "Air sungai di {place} melepasi paras bahaya, sila elak kawasan rendah. #banjir"),
+    ('en', "Flash flood reported in {place}, water is knee-deep near the market."),
+    ('en', "Heavy rain in {place} since morning, several roads closed due to flood."),
+    ('en', "Evacuation centre opened in {place}, families moved as flood waters rise."),
+    ('en', "River level at {place} above danger mark. Stay safe everyone #flood #Sabah"),
+]
+
+OTHER_TEMPLATES = [
+    ('in', "Makan tengah hari di {place} hari ini, sedap betul!"),
+    ('in', "Selamat pagi semua, cuaca cerah di {place}."),
+    ('en', "Traffic is slow on the way to {place} this morning."),
+    ('en', "Weekend trip to {place}, highly recommend the seafood."),
+    ('in', "Jualan murah di {place} minggu ini, jangan lepaskan peluang."),
+]
+
+HANDLES = [
+    'borneopost', 'dailyexpress_my', 'sabahupdates', 'kk_traffic', 'metmalaysia',
+    'bomba_sabah', 'apm_sabah', 'rakyat_sabah', 'jesselton_news', 'tawau_today',
+    'sandakan_info', 'pantai_barat', 'kinabalu_watch', 'hujan_lebat', 'cuaca_my'
+]
+
+
+def make_tweet(index, relevant=0.6):
+    """Deterministic synthetic tweet at timeline position index (0 = initial top)."""
+    rng = random.Random(index)
+    tweet_id = TOP_ID - index * ID_STEP
+    handle = rng.choice(HANDLES)
+    lang, template = rng.choice(FLOOD_TEMPLATES if rng.random() < relevant else OTHER_TEMPLATES)
+    created = TOP_TIME - timedelta(seconds=index * SECONDS_BETWEEN_TWEETS)
+    return {
+        '__typename': 'Tweet',
+        'rest_id': str(tweet_id),
+        'core': {'user_results': {'result': {'legacy': {
+            'screen_name': handle,
+            'name': handle.replace('_', ' ').title()
+        }}}},
+        'legacy': {
+            'id_str': str(tweet_id),
+            'full_text': template.format(place=rng.choice(PLACES)),
+            'created_at': created.strftime('%a %b %d %H:%M:%S +0000 %Y'),
+            'lang': lang,
+            'reply_count': rng.randint(0, 40),
+            'retweet_count': rng.randint(0, 300),
+            'favorite_count': rng.randint(0, 5000),
+        },
+        'views': {'count': str(rng.randint(100, 250000))}
+    }
+
+
+def timeline_page(start, count, relevant=0.6):
+    """A SearchTimeline response holding tweets start..start+count-1 and a bottom cursor."""
+    entries = [{
+        'entryId': f'tweet-{TOP_ID - i * ID_STEP}',
+        'content': {
+            'entryType': 'TimelineTimelineItem',
+            'itemContent': {
+                'itemType': 'TimelineTweet',
+                'tweet_results': {'result': make_tweet(i, relevant)}
+            }
+        }
+    } for i in range(start, start + count)]
+    entries.append({
+        'entryId': f'cursor-bottom-{start + count}',
+        'content': {'entryType': 'TimelineTimelineCursor', 'cursorType': 'Bottom', 'value': str(start + count)}
+    })
+    return {'data': {'search_by_raw_query': {'search_timeline': {'timeline': {
+        'instructions': [{'type': 'TimelineAddEntries', 'entries': entries}]
+    }}}}}
+
+
+SHELL_PAGE = '''<!DOCTYPE html>
+<html dir="ltr" lang="en"><head><meta charset="utf-8"><title>{title}</title>
+<style>article {{ display: block; min-height: 140px; border-bottom: 1px solid #eee; }}</style></head>
+<body><div id="react-root"><nav role="navigation" aria-label="Primary"></nav>
+<main role="main"><div data-testid="primaryColumn">{content}</div></main>
+<div data-testid="sidebarColumn"></div></div>{script}</body></html>
+'''
+
+# Renders timeline entries client-side, like X. Links are absolute
+# https://x.com URLs so parsed records look exactly like live ones.
+TIMELINE_SCRIPT = '''<script>
+const TIMELINE_URL = %(timeline_url)s;
+const MAX_RENDERED = %(max_rendered)d;
+const timeline = document.querySelector('[data-testid="searchTimeline"]');
+let cursor = null;
+let loading = false;
+
+const escapeHtml = s => String(s).replace(/[&<>"]/g, c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}[c]));
+const compact = n => n >= 1000000 ? (n / 1000000).toFixed(1) + 'M' : n >= 1000 ? (n / 1000).toFixed(1) + 'K' : String(n);
+
+function articleHtml(tweet) {
+    const legacy = tweet.legacy;
+    const user = tweet.core.user_results.result.legacy;
+    const status = 'https://x.com/' + user.screen_name + '/status/' + legacy.id_str;
+    const when = new Date(legacy.created_at).toISOString();
+    return '<article aria-labelledby="id__' + legacy.id_str + '" role="article" tabindex="0" data-testid="tweet">'
+        + '<div data-testid="User-Name"><a href="https://x.com/' + user.screen_name + '" role="link">'
+        + '<span>' + escapeHtml(user.name) + '</span></a>'
+        + '<a href="https://x.com/' + user.screen_name + '" role="link" tabindex="-1">'
+        + '<span class="css-1jxf684 css-1qaijid">@' + user.screen_name + '</span></a>'
+        + '<a href="' + status + '" role="link"><time datetime="' + when + '">'
+        + when.slice(0, 10) + '</time></a></div>'
+        + '<div lang="' + legacy.lang + '" data-testid="tweetText"><span>' + escapeHtml(legacy.full_text) + '</span></div>'
+        + '<div role="group">'
+        + '<div data-testid="reply"><span>' + compact(legacy.reply_count) + '</span></div>'
+        + '<div data-testid="retweet"><span>' + compact(legacy.retweet_count) + '</span></div>'
+        + '<div data-testid="like"><span>' + compact(legacy.favorite_count) + '</span></div>'
+        + '<a href="' + status + '/analytics"><span>' + compact(Number(tweet.views.count)) + '</span></a>'
+        + '</div></article>';
+}
+
+async function loadMore() {
+    if (loading) return;
+    loading = true;
+    try {
+        const response = await fetch(TIMELINE_URL + (cursor ? '?cursor=' + cursor : ''));
+        const payload = await response.json();
+        const instructions = payload.data.search_by_raw_query.search_timeline.timeline.instructions;
+        for (const entry of instructions[0].entries) {
+            const content = entry.content;
+            if (content.entryType === 'TimelineTimelineCursor') {
+                cursor = content.value;
+                continue;
+            }
+            const cell = document.createElement('div');
+            cell.setAttribute('data-testid', 'cellInnerDiv');
+            cell.innerHTML = articleHtml(content.itemContent.tweet_results.result);
+            timeline.appendChild(cell);
+        }
+        // X virtualises the timeline; optionally drop cells scrolled far out of view
+        while (MAX_RENDERED && timeline.children.length > MAX_RENDERED) {
+            timeline.removeChild(timeline.firstElementChild);
+        }
+    } finally {
+        loading = false;
+    }
+}
+
+window.addEventListener('scroll', () => {
+    if (window.innerHeight + window.scrollY >= document.body.scrollHeight - 800) {
+        loadMore();
+    }
+});
+loadMore();
+</script>'''
+
+
+class MockTimeline:
+    """Timeline settings shared by request handlers.
+
+    rate > 0 makes new tweets appear at the top of the live timeline, that
+    many per second, as during a flood event: a fresh page load starts at
+    newer (negative-index) tweets, while cursors keep paging downwards.
+    """
+
+    def __init__(self, page_size=20, latency=0.3, rate=0.0, relevant=0.6, max_rendered=0):
+        self.page_size = page_size
+        self.latency = latency
+        self.rate = rate
+        self.relevant = relevant
+        self.max_rendered = max_rendered
+        self.started = time.monotonic()
+        self.responses = 0
+        self.tweets_served = 0
+        self.lock = threading.Lock()
+
+    def top_index(self):
+        return -int(self.rate * (time.monotonic() - self.started))
+
+    def page(self, cursor):
+        start = int(cursor) if cursor not in (None, '') else self.top_index()
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            self.responses += 1
+            self.tweets_served += self.page_size
+        return timeline_page(start, self.page_size, self.relevant)
+
+
+def make_handler(timeline):
+    class MockXHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, body, content_type='text/html; charset=utf-8', status=200):
+            data = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = parse_qs(url.query)
+
+            if url.path == TIMELINE_PATH:
+                payload = timeline.page((params.get('cursor') or [None])[0])
+                self._send(json.dumps(payload), 'application/json')
+            elif url.path == '/search':
+                query = (params.get('q') or [''])[0]
+                script = TIMELINE_SCRIPT % {
+                    'timeline_url': json.dumps(TIMELINE_PATH),
+                    'max_rendered': timeline.max_rendered
+                }
+                self._send(SHELL_PAGE.format(
+                    title=f'{query} - Search / X',
+                    content='<div aria-label="Timeline: Search timeline" data-testid="searchTimeline"></div>',
+                    script=script
+                ))
+            elif url.path in ('/', '/home', '/login'):
+                self._send(SHELL_PAGE.format(title='Home / X', content='', script=''))
+            else:
+                self._send('Not found', 'text/plain', 404)
+
+    return MockXHandler
+
+
+def start_server(port=0, **settings):
+    """Start the mock server on a background thread; returns (server, timeline, base_url)."""
+    timeline = MockTimeline(**settings)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(timeline))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, timeline, f'http://127.0.0.1:{server.server_address[1]}/'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mock X live search timeline')
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--page-size', type=int, default=20, help='tweets per timeline response')
+    parser.add_argument('--latency', type=float, default=0.3, help='seconds before each timeline response')
+    parser.add_argument('--rate', type=float, default=0.0, help='new tweets per second at the top of the timeline')
+    parser.add_argument('--relevant', type=float, default=0.6, help='share of tweets about floods')
+    parser.add_argument('--max-rendered', type=int, default=0, help='virtualise the timeline to this many cells')
+    args = parser.parse_args()
+
+    server, timeline, base_url = start_server(args.port, page_size=args.page_size, latency=args.latency,
+                                              rate=args.rate, relevant=args.relevant,
+                                              max_rendered=args.max_rendered)
+    print(f"Mock X serving on {base_url} (search: {base_url}search?q=banjir)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        print(f"Served {timeline.tweets_served} tweets in {timeline.responses} timeline responses")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,411 @@
+"""Bulk backfills through LOAD DATA LOCAL INFILE.
+
+Records are serialized to MySQL's default tab-separated format and
+streamed into a TEMPORARY staging table with one LOAD DATA LOCAL
+statement, then merged into the real table with one INSERT ... SELECT
+that creates missing locations and resolves duplicate keys in SQL. This
+replaces millions of row-by-row INSERT round trips with two statements.
+
+By default the TSV never touches disk: it is written to a named pipe by a
+background thread while pymysql's LoadLocalFile reads the other end.
+BULK_LOAD_MODE=file writes a temporary TSV instead (needed on Windows,
+which has no os.mkfifo). The server must allow local_infile (an RDS
+parameter group setting).
+
+    python bulk_load.py tweets archive.jsonl [more.jsonl ...]
+    python bulk_load.py forecasts forecast_2024-12.json [...] [--upsert]
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+from datetime import datetime
+from rds_connector import open_rds_connection
+from gazetteer import SABAH_GAZETTEER
+from tweet_fields import status_id
+from tweet_writer import X_SOURCE_ID, ensure_x_source
+from sync_locations import sync_location_aliases
+from fetch_weather_forecast import WeatherAPIConnector
+
+BULK_LOAD_MODE = os.environ.get('BULK_LOAD_MODE', 'pipe' if hasattr(os, 'mkfifo') else 'file')
+
+# LOAD DATA's default escaping: FIELDS TERMINATED BY '\t' ESCAPED BY '\\'
+# LINES TERMINATED BY '\n', with \N for NULL
+_TSV_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r', '\0': '\\0'})
+NULL = '\\N'
+
+LOAD_QUERY = r"""
+    LOAD DATA LOCAL INFILE %s INTO TABLE {table}
+    CHARACTER SET utf8mb4
+    FIELDS TERMINATED BY '\t' ESCAPED BY '\\'
+    LINES TERMINATED BY '\n'
+    ({columns})
+"""
+
+# Staging tables carry no keys so the load is a straight append;
+# locations travel by name and are resolved during the merge
+TWEET_STAGING = ('x_post_staging', """
+    CREATE TEMPORARY TABLE x_post_staging (
+        source_id INT NOT NULL,
+        location_name VARCHAR(100),
+        location_names VARCHAR(2000),
+        original_id VARCHAR(255) NOT NULL,
+        content TEXT NOT NULL,
+        post_time DATETIME NOT NULL,
+        url VARCHAR(500),
+        likes_count INT,
+        retweets_count INT,
+        replies_count INT,
+        views_count INT
+    )
+""", ('source_id', 'location_name', 'location_names', 'original_id', 'content', 'post_time', 'url',
+      'likes_count', 'retweets_count', 'replies_count', 'views_count'))
+
+FORECAST_STAGING = ('meteorological_alert_staging', """
+    CREATE TEMPORARY TABLE meteorological_alert_staging (
+        location_name VARCHAR(100) NOT NULL,
+        alert_type VARCHAR(50) NOT NULL,
+        severity_level VARCHAR(20) NOT NULL,
+        description TEXT,
+        issued_at TIMESTAMP NOT NULL,
+        source_url VARCHAR(500),
+        content_hash CHAR(64)
+    )
+""", ('location_name', 'alert_type', 'severity_level', 'description', 'issued_at',
+      'source_url', 'content_hash'))
+
+# location.name is not unique, so the lowest id stands for a name,
+# matching DatabaseIntegration and the weather job
+CREATE_LOCATIONS_QUERY = """
+    INSERT INTO location (name, location_type, state)
+    SELECT DISTINCT s.location_name, 'CITY', 'SABAH' FROM {table} s
+    WHERE s.location_name IS NOT NULL
+    AND NOT EXISTS (SELECT 1 FROM location l WHERE l.name = s.location_name)
+"""
+
+LOCATION_IDS = "(SELECT name, MIN(location_id) AS location_id FROM location GROUP BY name)"
+
+# A tweet seen again keeps its stored text; engagement counts only grow
+MERGE_TWEETS_QUERY = f"""
+    INSERT INTO x_post
+    (source_id, location_id, original_id, content, post_time, url,
+     likes_count, retweets_count, replies_count, views_count)
+    SELECT s.source_id, l.location_id, s.original_id, s.content, s.post_time, s.url,
+           s.likes_count, s.retweets_count, s.replies_count, s.views_count
+    FROM x_post_staging s
+    LEFT JOIN {LOCATION_IDS} l ON l.name = s.location_name
+    ON DUPLICATE KEY UPDATE
+    location_id = COALESCE(x_post.location_id, VALUES(location_id)),
+    likes_count = GREATEST(x_post.likes_count, VALUES(likes_count)),
+    retweets_count = GREATEST(x_post.retweets_count, VALUES(retweets_count)),
+    replies_count = GREATEST(x_post.replies_count, VALUES(replies_count)),
+    views_count = GREATEST(x_post.views_count, VALUES(views_count))
+"""
+
+# Every location a tweet mentions, comma-separated in location_names
+# (gazetteer names have no commas); the location table is small, so
+# FIND_IN_SET against it is cheap next to the merge
+LINK_TWEET_LOCATIONS_QUERY = f"""
+    INSERT IGNORE INTO postlocation (x_post_id, location_id)
+    SELECT p.x_post_id, l.location_id
+    FROM x_post_staging s
+    JOIN x_post p ON p.original_id = s.original_id
+    JOIN {LOCATION_IDS} l ON FIND_IN_SET(l.name, s.location_names)
+    WHERE s.location_names IS NOT NULL
+"""
+
+MERGE_FORECASTS_SELECT = f"""
+    SELECT l.location_id, s.alert_type, s.severity_level, s.description, s.issued_at,
+           'ACTIVE', s.source_url, NOW(), s.content_hash
+    FROM meteorological_alert_staging s
+    JOIN {LOCATION_IDS} l ON l.name = s.location_name
+"""
+
+MERGE_FORECASTS_COLUMNS = """
+    (location_id, alert_type, severity_level, description, issued_at,
+     status, source_url, created_at, content_hash)
+"""
+
+# Same duplicate handling as WeatherAPIConnector's insert and upsert modes
+MERGE_FORECASTS_QUERIES = {
+    'insert': "INSERT IGNORE INTO meteorological_alert" + MERGE_FORECASTS_COLUMNS + MERGE_FORECASTS_SELECT,
+    'upsert': "INSERT INTO meteorological_alert" + MERGE_FORECASTS_COLUMNS + MERGE_FORECASTS_SELECT + """
+    ON DUPLICATE KEY UPDATE
+    alert_type = IF(meteorological_alert.content_hash <=> VALUES(content_hash),
+                    meteorological_alert.alert_type, VALUES(alert_type)),
+    severity_level = IF(meteorological_alert.content_hash <=> VALUES(content_hash),
+                        meteorological_alert.severity_level, VALUES(severity_level)),
+    description = IF(meteorological_alert.content_hash <=> VALUES(content_hash),
+                     meteorological_alert.description, VALUES(description)),
+    content_hash = VALUES(content_hash)
+"""
+}
+
+
+def tsv_field(value):
+    if value is None:
+        return NULL
+    if isinstance(value, datetime):
+        return value.isoformat(' ', 'seconds')
+    return str(value).translate(_TSV_ESCAPES)
+
+
+def tsv_line(row):
+    return '\t'.join(map(tsv_field, row)) + '\n'
+
+
+def tweet_rows(tweets, source_id=X_SOURCE_ID):
+    """Staging rows for scraped tweet records; tweets without a status id are skipped."""
+    for tweet in tweets:
+        original_id = status_id(tweet)
+        content = tweet.get('content') or ''
+        if not original_id.isdigit() or not content:
+            continue
+        location_names = [location_id.title() for location_id in SABAH_GAZETTEER.mentioned_ids(content)]
+        yield (
+            source_id,
+            location_names[0] if location_names else None,
+            ','.join(location_names) or None,
+            original_id,
+            content,
+            _post_time(tweet.get('date')),
+            tweet.get('url'),
+            tweet.get('likes') or 0,
+            tweet.get('retweets') or 0,
+            tweet.get('replies') or 0,
+            tweet.get('views') or 0
+        )
+
+
+def _post_time(date_str):
+    try:
+        return datetime.fromisoformat(date_str.replace('Z', '+00:00')).replace(tzinfo=None)
+    except (AttributeError, ValueError):
+        return datetime.now()
+
+
+def forecast_rows(forecasts, source_url=None):
+    """Staging rows for raw forecast API records in Sabah, built as the weather job builds them."""
+    source_url = source_url or WeatherAPIConnector().api_url
+    for forecast in forecasts:
+        location = forecast.get('location', {})
+        if isinstance(location, dict):
+            location_name = location.get('location_name') or location.get('name') or 'Unknown'
+        else:
+            location_name = str(location) if location else 'Unknown'
+        if not SABAH_GAZETTEER.contains(location_name):
+            continue
+
+        alert_type = forecast.get('summary_forecast', 'GENERAL_FORECAST')
+        severity_level = WeatherAPIConnector.determine_severity(forecast)
+        description = WeatherAPIConnector.build_description(forecast)
+        yield (
+            location_name,
+            alert_type,
+            severity_level,
+            description,
+            WeatherAPIConnector.parse_datetime(forecast.get('date', '')),
+            source_url,
+            WeatherAPIConnector.content_hash(alert_type, severity_level, description)
+        )
+
+
+class _TsvSource:
+    """Serializes rows to a path LoadLocalFile can read: a named pipe fed by a thread, or a temp file."""
+
+    def __init__(self, rows, mode=BULK_LOAD_MODE):
+        self.rows = rows
+        self.mode = mode
+        self.written = 0
+        self.error = None
+        self.thread = None
+        self.opened = threading.Event()
+        self.abandoned = False
+        self.directory = tempfile.mkdtemp(prefix='bulk_load_')
+        self.path = os.path.join(self.directory, 'rows.tsv')
+
+    def __enter__(self):
+        if self.mode == 'pipe':
+            os.mkfifo(self.path, 0o600)
+            self.thread = threading.Thread(target=self._write, name='bulk-load-writer', daemon=True)
+            self.thread.start()
+        else:
+            self._write()
+            if self.error:
+                raise self.error
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.thread is not None and self.thread.is_alive():
+            # The LOAD never opened the pipe (e.g. it was rejected); open the
+            # read end ourselves so the writer's open() returns, then close it
+            # so its next write fails and it stops
+            self.abandoned = True
+            try:
+                fd = os.open(self.path, os.O_RDONLY | os.O_NONBLOCK)
+            except OSError:
+                fd = None
+            self.opened.wait(5)
+            if fd is not None:
+                os.close(fd)
+            self.thread.join(5)
+        try:
+            os.remove(self.path)
+            os.rmdir(self.directory)
+        except OSError:
+            pass
+
+    def _write(self):
+        try:
+            # Opening a pipe for writing blocks until the reader opens it
+            with open(self.path, 'w', encoding='utf-8', newline='\n', buffering=1 << 20) as f:
+                self.opened.set()
+                for row in self.rows:
+                    if self.abandoned:
+                        break
+                    f.write(tsv_line(row))
+                    self.written += 1
+        except Exception as e:
+            self.error = e
+
+    def finish(self):
+        """Wait for the writer and surface anything it failed on."""
+        if self.thread is not None:
+            self.thread.join()
+        if self.error:
+            raise self.error
+
+
+def load_staging(cursor, staging, rows, mode=BULK_LOAD_MODE):
+    """(Re)create a staging table and stream rows into it; returns the number loaded."""
+    table, create_sql, columns = staging
+    cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {table}")
+    cursor.execute(create_sql)
+
+    with _TsvSource(rows, mode) as source:
+        cursor.execute(LOAD_QUERY.format(table=table, columns=', '.join(columns)), (source.path,))
+        loaded = cursor.rowcount
+        source.finish()
+
+    if loaded != source.written:
+        print(f"Warning: wrote {source.written} rows but {table} received {loaded}")
+    return loaded
+
+
+def bulk_load(staging, rows, merge_query, prepare=None, mode=BULK_LOAD_MODE, link_query=None):
+    """Stage rows and merge them in one transaction; returns {'staged', 'affected', seconds}.
+
+    link_query, if given, runs after the merge while the staging table is
+    still there.
+    """
+    connection = open_rds_connection(local_infile=True)
+    try:
+        with connection.cursor() as cursor:
+            if prepare:
+                prepare(cursor)
+
+            start = time.perf_counter()
+            staged = load_staging(cursor, staging, rows, mode)
+            load_seconds = time.perf_counter() - start
+
+            cursor.execute(CREATE_LOCATIONS_QUERY.format(table=staging[0]))
+            # Inserted rows count 1 and updated rows 2, as for any ON DUPLICATE KEY UPDATE
+            cursor.execute(merge_query)
+            affected = cursor.rowcount
+            if link_query:
+                cursor.execute(link_query)
+            merge_seconds = time.perf_counter() - start - load_seconds
+
+            cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {staging[0]}")
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+    return {
+        'staged': staged,
+        'affected': affected,
+        'load_seconds': round(load_seconds, 2),
+        'merge_seconds': round(merge_seconds, 2),
+        'rows_per_minute': round(staged * 60 / (load_seconds + merge_seconds)) if staged else 0
+    }
+
+
+def bulk_load_tweets(tweets, mode=BULK_LOAD_MODE):
+    """Backfill x_post from an iterable of scraped tweet records."""
+    return bulk_load(TWEET_STAGING, tweet_rows(tweets), MERGE_TWEETS_QUERY, prepare=prepare_tweets, mode=mode,
+                     link_query=LINK_TWEET_LOCATIONS_QUERY)
+
+
+def prepare_tweets(cursor):
+    """Ensure the X source, and every gazetteer location and postlocation, exist before the merge."""
+    ensure_x_source(cursor)
+    sync_location_aliases(cursor)
+
+
+def bulk_load_forecasts(forecasts, store_mode='insert', mode=BULK_LOAD_MODE):
+    """Backfill meteorological_alert from an iterable of raw forecast API records."""
+    if store_mode not in MERGE_FORECASTS_QUERIES:
+        raise ValueError(f"Unknown store mode: {store_mode}")
+    return bulk_load(FORECAST_STAGING, forecast_rows(forecasts), MERGE_FORECASTS_QUERIES[store_mode],
+                     prepare=WeatherAPIConnector.ensure_content_hash_column, mode=mode)
+
+
+def read_records(paths):
+    """Yield records from JSON-lines files, or files holding one JSON array or {'data': [...]}."""
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            first = f.read(1)
+            while first.isspace():
+                first = f.read(1)
+            f.seek(0)
+            if first == '[' or first == '{' and not _is_json_lines(f):
+                data = json.load(f)
+                if isinstance(data, dict):
+                    data = data['data'] if 'data' in data else [data]
+                yield from data
+            else:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+
+
+def _is_json_lines(f):
+    """True if f has more than one line and the first is a complete JSON value on its own."""
+    line = f.readline()
+    more = bool(f.readline().strip())
+    f.seek(0)
+    try:
+        json.loads(line)
+        return more
+    except ValueError:
+        return False
+
+
+def main():
+    args = sys.argv[1:]
+    kind = args.pop(0) if args else None
+    upsert = '--upsert' in args
+    paths = [arg for arg in args if arg != '--upsert']
+    if kind not in ('tweets', 'forecasts') or not paths:
+        print(__doc__, file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        if kind == 'tweets':
+            result = bulk_load_tweets(read_records(paths))
+        else:
+            result = bulk_load_forecasts(read_records(paths), 'upsert' if upsert else 'insert')
+    except Exception as e:
+        print(f"Bulk load failed: {e}")
+        sys.exit(1)
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,280 @@
+import os
+import time
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Defaults for every pool; each can be overridden per pool
+POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '5'))
+# Seconds to wait for a free connection before giving up
+POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', '30'))
+# Connections older than this are closed instead of reused (RDS and NAT
+# gateways drop long-lived sockets; wait_timeout defaults to 8 hours)
+POOL_MAX_LIFETIME = float(os.environ.get('DB_POOL_MAX_LIFETIME', '1800'))
+# Connections idle longer than this are pinged before being handed out
+POOL_PING_INTERVAL = float(os.environ.get('DB_POOL_PING_INTERVAL', '30'))
+# Checkouts that wait or are held longer than this are logged
+POOL_SLOW_SECONDS = float(os.environ.get('DB_POOL_SLOW_SECONDS', '5'))
+
+# pymysql has no in_transaction property; read the server status flag instead
+SERVER_STATUS_IN_TRANS = 1
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+def in_transaction(connection):
+    """True if the driver connection has an open transaction (mysql.connector or pymysql)."""
+    if hasattr(connection, 'in_transaction'):
+        return connection.in_transaction
+    return bool(getattr(connection, 'server_status', 0) & SERVER_STATUS_IN_TRANS)
+
+
+class _Entry:
+    __slots__ = ('connection', 'created_at', 'used_at')
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.created_at = time.monotonic()
+        self.used_at = self.created_at
+
+
+class PooledConnection:
+    """A checked-out connection; close() hands it back to the pool.
+
+    Everything else is passed through to the driver connection, so code
+    written against mysql.connector or pymysql connections keeps working.
+    """
+
+    def __init__(self, pool, entry, wait_seconds):
+        self._pool = pool
+        self._entry = entry
+        self._checked_out_at = time.monotonic()
+        self.wait_seconds = wait_seconds
+
+    def __getattr__(self, name):
+        if self._entry is None:
+            raise AttributeError(f"Connection already returned to pool '{self._pool.name}'")
+        return getattr(self._entry.connection, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release(failed=exc_type is not None)
+        return False
+
+    @property
+    def raw(self):
+        """The underlying driver connection."""
+        return self._entry.connection if self._entry else None
+
+    def release(self, failed=False):
+        if self._entry is None:
+            return
+        entry, self._entry = self._entry, None
+        self._pool._release(entry, time.monotonic() - self._checked_out_at, failed)
+
+    def close(self):
+        self.release()
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of database connections.
+
+    connect is any zero-argument callable returning a mysql.connector or
+    pymysql connection. At most max_size connections exist at once; a
+    checkout waits up to timeout seconds for one to come back. Idle
+    connections are pinged before reuse and closed once they are older
+    than max_lifetime. Connections go back to the pool with any open
+    transaction rolled back.
+    """
+
+    def __init__(self, connect, name='db', max_size=None, timeout=None, max_lifetime=None,
+                 ping_interval=None, slow_seconds=None):
+        self.connect = connect
+        self.name = name
+        self.max_size = max_size or POOL_SIZE
+        self.timeout = POOL_TIMEOUT if timeout is None else timeout
+        self.max_lifetime = POOL_MAX_LIFETIME if max_lifetime is None else max_lifetime
+        self.ping_interval = POOL_PING_INTERVAL if ping_interval is None else ping_interval
+        self.slow_seconds = POOL_SLOW_SECONDS if slow_seconds is None else slow_seconds
+
+        self._idle = deque()
+        self._open = 0
+        self._cond = threading.Condition()
+        self.closed = False
+
+        self.checkouts = 0
+        self.created = 0
+        self.recycled = 0
+        self.ping_failures = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.connect_seconds = 0.0
+        self.held_seconds = 0.0
+        self.max_held_seconds = 0.0
+
+    def checkout(self, timeout=None):
+        """Return a PooledConnection; call close() to give it back.
+
+        As a context manager (with pool.checkout() as conn:) the connection
+        is rolled back if the block raises and returned to the pool either way.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+
+        with self._cond:
+            while not self._idle and self._open >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(f"No connection free in pool '{self.name}' after {timeout:.1f}s "
+                                      f"({self._open} of {self.max_size} in use)")
+                self._cond.wait(remaining)
+            # Most recently used first: it is the least likely to have gone stale
+            entry = self._idle.pop() if self._idle else None
+            if entry is None:
+                self._open += 1
+
+        try:
+            entry = self._ready(entry)
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+
+        wait = time.monotonic() - start
+        with self._cond:
+            self.checkouts += 1
+            self.wait_seconds += wait
+            self.max_wait_seconds = max(self.max_wait_seconds, wait)
+        if wait > self.slow_seconds:
+            logger.warning(f"Pool '{self.name}': checkout took {wait:.2f}s")
+        return PooledConnection(self, entry, wait)
+
+    def _ready(self, entry):
+        """Turn an idle entry (or None for a free slot) into a usable connection."""
+        now = time.monotonic()
+        if entry is not None and now - entry.created_at > self.max_lifetime:
+            self._count('recycled')
+            self._close(entry)
+            entry = None
+        elif entry is not None and now - entry.used_at > self.ping_interval:
+            try:
+                entry.connection.ping(reconnect=False)
+            except Exception as e:
+                logger.warning(f"Pool '{self.name}': idle connection failed ping, reconnecting: {e}")
+                self._count('ping_failures')
+                self._close(entry)
+                entry = None
+
+        if entry is None:
+            start = time.monotonic()
+            entry = _Entry(self.connect())
+            with self._cond:
+                self.connect_seconds += time.monotonic() - start
+                self.created += 1
+        return entry
+
+    def _count(self, name):
+        with self._cond:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _release(self, entry, held, failed):
+        # pymysql drops its socket after a network error; mysql.connector
+        # has no cheap equivalent and is caught by the ping instead
+        keep = getattr(entry.connection, 'open', True)
+        try:
+            if keep and (failed or in_transaction(entry.connection)):
+                entry.connection.rollback()
+        except Exception as e:
+            # The socket is unusable; the next checkout opens a new one
+            logger.warning(f"Pool '{self.name}': rollback failed, dropping connection: {e}")
+            keep = False
+
+        if keep and (self.closed or time.monotonic() - entry.created_at > self.max_lifetime):
+            self._count('recycled')
+            keep = False
+
+        if not keep:
+            self._close(entry)
+
+        if held > self.slow_seconds:
+            logger.info(f"Pool '{self.name}': connection held for {held:.2f}s")
+
+        with self._cond:
+            self.held_seconds += held
+            self.max_held_seconds = max(self.max_held_seconds, held)
+            if keep:
+                entry.used_at = time.monotonic()
+                self._idle.append(entry)
+            else:
+                self._open -= 1
+            self._cond.notify()
+
+    @staticmethod
+    def _close(entry):
+        try:
+            entry.connection.close()
+        except Exception:
+            pass
+
+    def close(self):
+        """Close idle connections; checked-out ones are closed when returned."""
+        with self._cond:
+            self.closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for entry in idle:
+            self._close(entry)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'name': self.name,
+                'open': self._open,
+                'idle': len(self._idle),
+                'max_size': self.max_size,
+                'checkouts': self.checkouts,
+                'created': self.created,
+                'recycled': self.recycled,
+                'ping_failures': self.ping_failures,
+                'timeouts': self.timeouts,
+                'avg_wait_ms': round(self.wait_seconds * 1000 / self.checkouts, 2) if self.checkouts else 0.0,
+                'max_wait_ms': round(self.max_wait_seconds * 1000, 2),
+                'avg_connect_ms': round(self.connect_seconds * 1000 / self.created, 2) if self.created else 0.0,
+                'avg_held_ms': round(self.held_seconds * 1000 / self.checkouts, 2) if self.checkouts else 0.0,
+                'max_held_ms': round(self.max_held_seconds * 1000, 2)
+            }
+
+
+def shared_pool(key, connect, **settings):
+    """Return the process-wide pool for key, creating it with connect on first use."""
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(connect, name=settings.pop('name', str(key)), **settings)
+        return pool
+
+
+def pool_stats():
+    with _pools_lock:
+        return [pool.stats() for pool in _pools.values()]
+
+
+def close_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close()
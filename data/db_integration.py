@@ -2,8 +2,21 @@ import mysql.connector
 from datetime import datetime
 import os
 import re
+from gazetteer import SABAH_GAZETTEER
+from connection_pool import shared_pool
 
 class DatabaseIntegration:
+    # Tweets per existence lookup and multi-row insert
+    BATCH_SIZE = 1000
+
+    INSERT_QUERY = '''
+        INSERT INTO x_post 
+        (source_id, location_id, original_id, content, post_time, url, 
+         sentiment_score, credibility_score, likes_count, retweets_count, 
+         replies_count, views_count)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    '''
+
     def __init__(self, db_config=None):
         if db_config is None:
             db_config = {
@@ -14,41 +27,66 @@ class DatabaseIntegration:
                 'port': os.environ.get('DB_PORT', '3306')
             }
         self.db_config = db_config
+        self._location_ids = None
+        # Instances with the same settings share one pool
+        self.pool = shared_pool(('mysql', tuple(sorted(db_config.items()))),
+                                lambda: mysql.connector.connect(**db_config),
+                                name=f"mysql:{db_config.get('host')}/{db_config.get('database')}")
 
     def get_connection(self):
-        return mysql.connector.connect(**self.db_config)
+        """Check out a pooled connection; close() returns it to the pool."""
+        return self.pool.checkout()
 
     def extract_location_from_content(self, content):
-        sabah_locations = [
-            'sabah', 'kota kinabalu', 'kk', 'sandakan', 'tawau', 'lahad datu',
-            'keningau', 'kudat', 'semporna', 'beaufort', 'kunak', 'tongod',
-            'kota marudu', 'pitas', 'beluran', 'kinabatangan', 'tuaran',
-            'papar', 'penampang', 'putatan', 'ranau', 'kota belud',
-            'sipitang', 'tenom', 'tambunan', 'nabawan'
-        ]
-        content_lower = content.lower()
-        for location in sabah_locations:
-            if location in content_lower:
-                return location.title()
+        if not content:
+            return None
+        match = SABAH_GAZETTEER.search(content)
+        if match:
+            return match.location_id.title()
         return None
 
+    def extract_locations_from_content(self, content):
+        """Every gazetteer location the content mentions, in order."""
+        if not content:
+            return []
+        return [location_id.title() for location_id in SABAH_GAZETTEER.mentioned_ids(content)]
+
     def find_or_create_location(self, content, cursor):
         location_name = self.extract_location_from_content(content)
         if not location_name:
             return None
 
         try:
-            # Insert if not exists
-            cursor.execute("INSERT IGNORE INTO location (name) VALUES (%s)", (location_name,))
-
-            # Get the location_id
-            cursor.execute("SELECT location_id FROM location WHERE name = %s", (location_name,))
-            result = cursor.fetchone()
-            return result[0] if result else None
+            return self.resolve_location_ids([location_name], cursor).get(location_name)
         except Exception as e:
             print(f"Error in find_or_create_location: {e}")
             return None
 
+    def resolve_location_ids(self, location_names, cursor):
+        """Return {name: location_id}, creating missing locations in one statement.
+
+        The name -> id map is loaded from the location table once per instance
+        and extended as locations are created.
+        """
+        if self._location_ids is None:
+            cursor.execute("SELECT location_id, name FROM location ORDER BY location_id")
+            self._location_ids = {}
+            for location_id, name in cursor.fetchall():
+                self._location_ids.setdefault(name, location_id)
+
+        missing = sorted({name for name in location_names if name} - set(self._location_ids))
+        if missing:
+            cursor.executemany("INSERT INTO location (name) VALUES (%s)", [(name,) for name in missing])
+            placeholders = ', '.join(['%s'] * len(missing))
+            cursor.execute(
+                f"SELECT location_id, name FROM location WHERE name IN ({placeholders}) ORDER BY location_id",
+                missing
+            )
+            for location_id, name in cursor.fetchall():
+                self._location_ids.setdefault(name, location_id)
+
+        return {name: self._location_ids.get(name) for name in location_names if name}
+
     def extract_original_id(self, url):
         if not url:
             return None
@@ -69,18 +107,19 @@ class DatabaseIntegration:
         except:
             return datetime.now()
 
-    def save_tweets_to_db(self, tweets):
+    def save_tweets_to_db(self, tweets, batch_size=None):
         if not tweets:
             print("No tweets to save.")
             return 0
 
+        batch_size = batch_size or self.BATCH_SIZE
         print(f"Attempting to save {len(tweets)} tweets...")
         saved_count = 0
         conn = None
         cursor = None
 
         try:
-            conn = mysql.connector.connect(**self.db_config)
+            conn = self.get_connection()
             cursor = conn.cursor(buffered=True)  # Use buffered cursor
 
             # Ensure source exists
@@ -94,64 +133,24 @@ class DatabaseIntegration:
 
             source_id = source_result[0]
 
+            # Validate and deduplicate in memory first; numbering matches the input
+            pending = []
+            seen_ids = set()
             for i, tweet in enumerate(tweets, 1):
-                try:
-                    original_id = self.extract_original_id(tweet.get('url', ''))
-
-                    if not original_id:
-                        print(f"  - Skipping tweet {i}: No valid original_id")
-                        continue
-
-                    # Check if tweet already exists
-                    cursor.execute("SELECT COUNT(*) FROM x_post WHERE original_id = %s", (original_id,))
-                    count_result = cursor.fetchone()
-
-                    if count_result and count_result[0] > 0:
-                        print(f"  - Tweet {i} already exists (duplicate)")
-                        continue
-
-                    # Find or create location
-                    location_id = self.find_or_create_location(tweet.get('content', ''), cursor)
-
-                    # Convert date
-                    post_time = self.convert_date_format(tweet.get('date', ''))
-
-                    # Insert tweet
-                    insert_query = '''
-                        INSERT INTO x_post 
-                        (source_id, location_id, original_id, content, post_time, url, 
-                         sentiment_score, credibility_score, likes_count, retweets_count, 
-                         replies_count, views_count)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    '''
-
-                    cursor.execute(insert_query, (
-                        source_id,
-                        location_id,
-                        original_id,
-                        tweet['content'],
-                        post_time,
-                        tweet.get('url'),
-                        None,  # sentiment_score
-                        None,  # credibility_score
-                        tweet.get('likes', 0),
-                        tweet.get('retweets', 0),
-                        tweet.get('replies', 0),
-                        tweet.get('views', 0)
-                    ))
-
-                    print(f"  - Successfully inserted tweet {i} (ID: {original_id})")
-                    saved_count += 1
-
-                except mysql.connector.IntegrityError as e:
-                    if "Duplicate entry" in str(e):
-                        print(f"  - Duplicate entry detected for tweet {i}")
-                    else:
-                        print(f"  - Integrity error for tweet {i}: {e}")
+                original_id = self.extract_original_id(tweet.get('url', ''))
+
+                if not original_id:
+                    print(f"  - Skipping tweet {i}: No valid original_id")
                     continue
-                except Exception as e:
-                    print(f"  - Error saving tweet {i}: {e}")
+
+                if original_id in seen_ids:
+                    print(f"  - Tweet {i} already exists (duplicate)")
                     continue
+                seen_ids.add(original_id)
+                pending.append((i, original_id, tweet))
+
+            for start in range(0, len(pending), batch_size):
+                saved_count += self._save_batch(cursor, source_id, pending[start:start + batch_size])
 
             conn.commit()
             print(f"Successfully saved {saved_count} new tweets to database")
@@ -160,10 +159,113 @@ class DatabaseIntegration:
             print(f"Database error: {e}")
             if conn:
                 conn.rollback()
+            # Locations created in the rolled-back transaction no longer exist
+            self._location_ids = None
         finally:
             if cursor:
                 cursor.close()
             if conn:
                 conn.close()
 
-        return saved_count
\ No newline at end of file
+        return saved_count
+
+    def _save_batch(self, cursor, source_id, batch):
+        """Insert one batch of (index, original_id, tweet); returns how many were saved."""
+        # One lookup for the whole batch instead of a COUNT(*) per tweet
+        placeholders = ', '.join(['%s'] * len(batch))
+        cursor.execute(
+            f"SELECT original_id FROM x_post WHERE original_id IN ({placeholders})",
+            [original_id for _, original_id, _ in batch]
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+
+        new = []
+        for i, original_id, tweet in batch:
+            if original_id in existing:
+                print(f"  - Tweet {i} already exists (duplicate)")
+                continue
+            new.append((i, original_id, tweet))
+
+        location_names = {i: self.extract_locations_from_content(tweet.get('content', '')) for i, _, tweet in new}
+        try:
+            location_ids = self.resolve_location_ids(
+                [name for names in location_names.values() for name in names], cursor)
+        except Exception as e:
+            print(f"Error in find_or_create_location: {e}")
+            location_ids = {}
+
+        rows = []
+        post_locations = {}
+        for i, original_id, tweet in new:
+            ids = [location_ids[name] for name in location_names[i] if location_ids.get(name)]
+            if ids:
+                post_locations[original_id] = ids
+            try:
+                rows.append((i, original_id, (
+                    source_id,
+                    ids[0] if ids else None,
+                    original_id,
+                    tweet['content'],
+                    self.convert_date_format(tweet.get('date', '')),
+                    tweet.get('url'),
+                    None,  # sentiment_score
+                    None,  # credibility_score
+                    tweet.get('likes', 0),
+                    tweet.get('retweets', 0),
+                    tweet.get('replies', 0),
+                    tweet.get('views', 0)
+                )))
+            except Exception as e:
+                print(f"  - Error saving tweet {i}: {e}")
+
+        if not rows:
+            return 0
+
+        try:
+            # mysql.connector rewrites executemany INSERTs into one multi-row statement
+            cursor.executemany(self.INSERT_QUERY, [values for _, _, values in rows])
+        except mysql.connector.Error as e:
+            # Something in the batch was rejected; retry row by row to report which
+            print(f"  - Batch insert failed ({e}); retrying {len(rows)} tweets individually")
+            saved_count = self._save_rows(cursor, rows)
+        else:
+            for i, original_id, _ in rows:
+                print(f"  - Successfully inserted tweet {i} (ID: {original_id})")
+            saved_count = len(rows)
+
+        try:
+            self.link_post_locations(post_locations, cursor)
+        except Exception as e:
+            print(f"Error linking post locations: {e}")
+        return saved_count
+
+    def link_post_locations(self, post_locations, cursor):
+        """Insert postlocation rows for {original_id: location_ids} of stored posts."""
+        if not post_locations:
+            return
+        placeholders = ', '.join(['%s'] * len(post_locations))
+        cursor.execute(
+            f"SELECT x_post_id, original_id FROM x_post WHERE original_id IN ({placeholders})",
+            list(post_locations)
+        )
+        rows = [(x_post_id, location_id)
+                for x_post_id, original_id in cursor.fetchall()
+                for location_id in post_locations.get(original_id, ())]
+        if rows:
+            cursor.executemany("INSERT IGNORE INTO postlocation (x_post_id, location_id) VALUES (%s, %s)", rows)
+
+    def _save_rows(self, cursor, rows):
+        saved_count = 0
+        for i, original_id, values in rows:
+            try:
+                cursor.execute(self.INSERT_QUERY, values)
+                print(f"  - Successfully inserted tweet {i} (ID: {original_id})")
+                saved_count += 1
+            except mysql.connector.IntegrityError as e:
+                if "Duplicate entry" in str(e):
+                    print(f"  - Duplicate entry detected for tweet {i}")
+                else:
+                    print(f"  - Integrity error for tweet {i}: {e}")
+            except Exception as e:
+                print(f"  - Error saving tweet {i}: {e}")
+        return saved_count
@@ -1,13 +1,42 @@
+import os
+import hashlib
 import requests
-from datetime import datetime
+from datetime import datetime, timedelta
 import pymysql
 from rds_connector import get_rds_connection
+from gazetteer import SABAH_GAZETTEER
 
 
 class WeatherAPIConnector:
+    # 'insert' keeps the first forecast stored for a location and day;
+    # 'upsert' rewrites it when a later fetch brings revised content
+    STORE_MODES = ('insert', 'upsert')
+
+    INSERT_QUERY = """
+                   INSERT IGNORE INTO meteorological_alert
+                   (location_id, alert_type, severity_level, description, issued_at,
+                    status, source_url, created_at, content_hash)
+                   VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                   """
+
+    # Assignments run left to right, so the IF()s still see the stored hash;
+    # a row whose hash matches is left untouched even if it raced this run
+    UPSERT_QUERY = """
+                   INSERT INTO meteorological_alert
+                   (location_id, alert_type, severity_level, description, issued_at,
+                    status, source_url, created_at, content_hash)
+                   VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                   ON DUPLICATE KEY UPDATE
+                   alert_type = IF(content_hash <=> VALUES(content_hash), alert_type, VALUES(alert_type)),
+                   severity_level = IF(content_hash <=> VALUES(content_hash), severity_level, VALUES(severity_level)),
+                   description = IF(content_hash <=> VALUES(content_hash), description, VALUES(description)),
+                   content_hash = VALUES(content_hash)
+                   """
+
     def __init__(self):
         self.api_url = "https://api.data.gov.my/weather/forecast"
         self.db_connection = None
+        self.content_hash_checked = False
 
     def fetch_weather_data(self):
         """Fetch weather forecast data from Malaysian government API"""
@@ -19,17 +48,24 @@ class WeatherAPIConnector:
             print(f"Error fetching weather data: {e}")
             return None
 
-    def process_and_store_data(self, weather_data):
-        """Process weather data and store in meteorological_alert table"""
+    def process_and_store_data(self, weather_data, mode='insert'):
+        """Process weather data and store in meteorological_alert table
+
+        Returns {'inserted', 'updated', 'unchanged'} counts.
+        """
+        if mode not in self.STORE_MODES:
+            raise ValueError(f"Unknown store mode: {mode}")
+
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
         if not weather_data:
-            return
+            return counts
     
         cursor = None
         try:
             self.db_connection = get_rds_connection()
             if not self.db_connection:
                 print("Failed to connect to RDS database")
-                return
+                return counts
     
             cursor = self.db_connection.cursor()
     
@@ -43,111 +79,78 @@ class WeatherAPIConnector:
             if forecasts:
                 print("Sample forecast structure:", forecasts[0])
     
-            sabah_count = 0
-            processed_entries = set()  # Track processed location-date combinations
-    
-            # Process each forecast entry
-            for forecast in forecasts:
-                # Extract location information
-                location_data = forecast.get('location', {})
-    
-                if isinstance(location_data, dict):
-                    location_name = (
-                        location_data.get('location_name') or
-                        location_data.get('name') or
-                        'Unknown'
-                    )
-                    location_id_api = location_data.get('location_id', '')
-                    state = 'SABAH'
-                else:
-                    location_name = str(location_data) if location_data else 'Unknown'
-                    location_id_api = ''
-                    state = 'SABAH'
-    
-                # Filter for Sabah locations
-                sabah_keywords = [
-                    # Major cities and towns
-                    'sabah', 'kota kinabalu', 'sandakan', 'tawau', 'lahad datu',
-                    'semporna', 'kudat', 'keningau', 'beaufort', 'ranau',
-                    'tuaran', 'kota belud', 'papar', 'penampang', 'putatan',
-                    'kota marudu', 'beluran', 'kinabatangan', 'tongod',
-
-                    # Additional districts and towns
-                    'sipitang', 'kuala penyu', 'membakut', 'tambunan', 'kota kinabatangan',
-                    'telupid', 'pitas', 'kunak', 'kalabakan', 'tenom',
-
-                    # Sub-districts and smaller areas
-                    'kundasang', 'kinarut', 'inanam', 'menggatal', 'sepanggar',
-                    'likas', 'tanjung aru', 'donggongon', 'moyog', 'kimanis',
-                    'kuala abai', 'bongawan', 'lumadan', 'klias', 'pandasan',
-
-                    # Islands and coastal areas
-                    'pulau gaya', 'pulau sapi', 'pulau manukan', 'pulau mamutik',
-                    'mabul', 'kapalai', 'sibuan', 'mantanani', 'balambangan',
-
-                    # Interior locations
-                    'maliau', 'danum valley', 'crocker range', 'kinabalu park',
-                    'deramakot', 'ulu segama', 'tabin', 'kulamba',
-
-                    # Alternative spellings and abbreviations
-                    'k.k.', 'kk', 'jesselton', 'api-api', 'labuan'  # Labuan is federal territory but often grouped with Sabah
-                ]
-                is_sabah_location = any(keyword in location_name.lower() for keyword in sabah_keywords)
-    
-                if not is_sabah_location:
-                    continue
-    
-                # Create a more unique key using location_id from API, location name, and date
-                forecast_date = forecast.get('date', '')
-                entry_key = f"{location_id_api}_{location_name}_{forecast_date}"
-                
-                if entry_key in processed_entries:
-                    print(f"Skipping duplicate: {location_name} for {forecast_date}")
-                    continue
-    
-                processed_entries.add(entry_key)
-                print(f"Processing Sabah location: {location_name}, Date: {forecast_date}")
-    
-                # Check if this exact forecast already exists in database
-                if self.check_existing_db(cursor, location_name, forecast_date):
-                    print(f"Forecast already exists in database for {location_name} on {forecast_date}")
-                    continue
-    
-                sabah_count += 1
-    
-                # Get or create location
-                location_id = self.get_or_create_location(cursor, location_name, state)
-    
-                # Extract alert information
+            if not self.content_hash_checked:
+                self.ensure_content_hash_column(cursor)
+                self.content_hash_checked = True
+
+            state = 'SABAH'
+            sabah_forecasts = self.select_sabah_forecasts(forecasts)
+            if not sabah_forecasts:
+                print("No Sabah forecasts to store")
+                return counts
+
+            # One range query over the forecast window instead of a lookup per row
+            issued_dates = [self.parse_datetime(forecast_date) for _, forecast_date, _ in sabah_forecasts]
+            window_start = min(issued_dates).replace(hour=0, minute=0, second=0, microsecond=0)
+            window_end = max(issued_dates).replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+            existing = self.load_existing_forecasts(cursor, window_start, window_end)
+
+            new_forecasts = []
+            for (location_name, forecast_date, forecast), issued_at in zip(sabah_forecasts, issued_dates):
                 alert_type = forecast.get('summary_forecast', 'GENERAL_FORECAST')
                 severity_level = self.determine_severity(forecast)
                 description = self.build_description(forecast)
-                issued_at = self.parse_datetime(forecast_date)
-    
-                # Insert meteorological alert with IGNORE to prevent duplicates
-                insert_query = """
-                               INSERT IGNORE INTO meteorological_alert
-                               (location_id, alert_type, severity_level, description, issued_at,
-                                status, source_url, created_at)
-                               VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                               """
-    
-                cursor.execute(insert_query, (
-                    location_id,
+                content_hash = self.content_hash(alert_type, severity_level, description)
+
+                key = (location_name, issued_at.date())
+                if key in existing:
+                    if mode == 'insert':
+                        print(f"Forecast already exists in database for {location_name} on {forecast_date}")
+                        counts['unchanged'] += 1
+                        continue
+                    if existing[key] == content_hash:
+                        counts['unchanged'] += 1
+                        continue
+                    print(f"Forecast revised for {location_name} on {forecast_date}")
+                    counts['updated'] += 1
+                else:
+                    counts['inserted'] += 1
+
+                new_forecasts.append((location_name, issued_at, alert_type, severity_level, description, content_hash))
+
+            # Location ids for every name, creating missing locations in one batch
+            location_ids = self.load_location_ids(cursor, state)
+            missing = sorted({forecast[0] for forecast in new_forecasts} - set(location_ids))
+            if missing:
+                location_ids.update(self.create_locations(cursor, missing, state))
+
+            created_at = datetime.now()
+            rows = [
+                (
+                    location_ids[location_name],
                     alert_type,
                     severity_level,
                     description,
                     issued_at,
                     'ACTIVE',
                     self.api_url,
-                    datetime.now()
-                ))
+                    created_at,
+                    content_hash
+                )
+                for location_name, issued_at, alert_type, severity_level, description, content_hash in new_forecasts
+            ]
+
+            if rows:
+                # All-placeholder VALUES, so pymysql sends one multi-row statement
+                cursor.executemany(self.UPSERT_QUERY if mode == 'upsert' else self.INSERT_QUERY, rows)
     
             self.db_connection.commit()
-            print(f"Successfully stored {sabah_count} unique Sabah weather forecasts")
+            print(f"Successfully stored Sabah weather forecasts: {counts['inserted']} inserted, "
+                  f"{counts['updated']} updated, {counts['unchanged']} unchanged")
     
         except Exception as e:
             print(f"RDS Database error: {e}")
+            counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
             if self.db_connection:
                 self.db_connection.rollback()
         finally:
@@ -155,44 +158,122 @@ class WeatherAPIConnector:
                 cursor.close()
             if self.db_connection:
                 self.db_connection.close()
-    
+
+        return counts
+
     @staticmethod
-    def check_existing_db(cursor, location_name, forecast_date):
-        """Check if forecast already exists in database"""
-        try:
-            cursor.execute("""
-                SELECT COUNT(*) FROM meteorological_alert ma
-                JOIN location l ON ma.location_id = l.location_id
-                WHERE l.name = %s AND DATE(ma.issued_at) = %s
-            """, (location_name, forecast_date))
-            
-            result = cursor.fetchone()
-            if isinstance(result, dict):
-                return result['COUNT(*)'] > 0
-            return result[0] > 0
-        except Exception as e:
-            print(f"Error checking existing forecast: {e}")
-            return False
+    def select_sabah_forecasts(forecasts):
+        """Return (location_name, forecast_date, forecast) for each distinct Sabah forecast"""
+        selected = []
+        processed_entries = set()  # Track processed location-date combinations
+
+        for forecast in forecasts:
+            # Extract location information
+            location_data = forecast.get('location', {})
+
+            if isinstance(location_data, dict):
+                location_name = (
+                    location_data.get('location_name') or
+                    location_data.get('name') or
+                    'Unknown'
+                )
+                location_id_api = location_data.get('location_id', '')
+            else:
+                location_name = str(location_data) if location_data else 'Unknown'
+                location_id_api = ''
+
+            # Filter for Sabah locations
+            if not SABAH_GAZETTEER.contains(location_name):
+                continue
+
+            # Create a more unique key using location_id from API, location name, and date
+            forecast_date = forecast.get('date', '')
+            entry_key = f"{location_id_api}_{location_name}_{forecast_date}"
+
+            if entry_key in processed_entries:
+                print(f"Skipping duplicate: {location_name} for {forecast_date}")
+                continue
+
+            processed_entries.add(entry_key)
+            print(f"Processing Sabah location: {location_name}, Date: {forecast_date}")
+            selected.append((location_name, forecast_date, forecast))
+
+        return selected
 
     @staticmethod
-    def get_or_create_location(cursor, location_name, state='SABAH'):
-        """Get existing location or create new one"""
-        # Try to find existing location
-        cursor.execute("SELECT location_id FROM location WHERE name = %s AND state = %s", (location_name, state))
+    def ensure_content_hash_column(cursor):
+        """Add meteorological_alert.content_hash to databases created before it was in schema.sql"""
+        cursor.execute("""
+            SELECT COUNT(*) AS found FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'meteorological_alert'
+            AND COLUMN_NAME = 'content_hash'
+        """)
         result = cursor.fetchone()
+        found = result['found'] if isinstance(result, dict) else result[0]
+        if not found:
+            print("Adding content_hash column to meteorological_alert")
+            cursor.execute("ALTER TABLE meteorological_alert ADD COLUMN content_hash CHAR(64)")
 
-        if result:
-            if isinstance(result, dict):
-                return result['location_id']
-            return result[0]
+    @staticmethod
+    def content_hash(alert_type, severity_level, description):
+        """Fingerprint of the stored forecast content, used to skip unchanged rows"""
+        content = '\x1f'.join((alert_type or '', severity_level or '', description or ''))
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
 
-        # Create new location
+    @staticmethod
+    def load_existing_forecasts(cursor, window_start, window_end):
+        """Map (location name, date) to content_hash for forecasts issued in [window_start, window_end)"""
+        # A plain range on issued_at can use idx_met_alert_issued_at;
+        # DATE(issued_at) = %s could not
         cursor.execute("""
+            SELECT l.name, ma.issued_at, ma.content_hash FROM meteorological_alert ma
+            JOIN location l ON ma.location_id = l.location_id
+            WHERE ma.issued_at >= %s AND ma.issued_at < %s
+        """, (window_start, window_end))
+
+        existing = {}
+        for row in cursor.fetchall():
+            if isinstance(row, dict):
+                existing[(row['name'], row['issued_at'].date())] = row['content_hash']
+            else:
+                existing[(row[0], row[1].date())] = row[2]
+        return existing
+
+    @staticmethod
+    def load_location_ids(cursor, state='SABAH'):
+        """Map location name to location_id for a state"""
+        cursor.execute("SELECT location_id, name FROM location WHERE state = %s ORDER BY location_id", (state,))
+
+        location_ids = {}
+        for row in cursor.fetchall():
+            if isinstance(row, dict):
+                location_ids.setdefault(row['name'], row['location_id'])
+            else:
+                location_ids.setdefault(row[1], row[0])
+        return location_ids
+
+    @staticmethod
+    def create_locations(cursor, names, state='SABAH'):
+        """Insert new locations in one statement and return their name -> location_id map"""
+        created_at = datetime.now()
+        cursor.executemany("""
                        INSERT INTO location (name, location_type, state, created_at)
                        VALUES (%s, %s, %s, %s)
-                       """, (location_name, 'CITY', state, datetime.now()))
-
-        return cursor.lastrowid
+                       """, [(name, 'CITY', state, created_at) for name in names])
+
+        placeholders = ', '.join(['%s'] * len(names))
+        cursor.execute(
+            f"SELECT location_id, name FROM location WHERE state = %s AND name IN ({placeholders}) ORDER BY location_id",
+            [state] + list(names)
+        )
+
+        location_ids = {}
+        for row in cursor.fetchall():
+            if isinstance(row, dict):
+                location_ids.setdefault(row['name'], row['location_id'])
+            else:
+                location_ids.setdefault(row[1], row[0])
+        return location_ids
 
     @staticmethod
     def determine_severity(forecast):
@@ -271,9 +352,11 @@ class WeatherAPIConnector:
 
 def main():
     """Main function to fetch and store weather data"""
+    # WEATHER_STORE_MODE=upsert updates forecasts revised since the last run
+    mode = os.environ.get('WEATHER_STORE_MODE', 'insert').strip().lower()
     weather_connector = WeatherAPIConnector()
     weather_data = weather_connector.fetch_weather_data()
-    weather_connector.process_and_store_data(weather_data)
+    weather_connector.process_and_store_data(weather_data, mode)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,283 @@
+import re
+from collections import namedtuple, deque
+from functools import lru_cache
+
+
+# Canonical Sabah locations and the spellings they are mentioned by.
+# The key is the canonical location id used across the scraper, the tweet
+# ingester and the weather job; aliases are matched case-insensitively on
+# word boundaries, with an optional leading '#'.
+SABAH_LOCATIONS = {
+    # --- State ---
+    "sabah": ["sabah"],
+
+    # --- Major Cities & Towns ---
+    "kota kinabalu": ["kota kinabalu", "kk", "k.k.", "jesselton", "api-api"],
+    "sandakan": ["sandakan"],
+    "tawau": ["tawau"],
+    "lahad datu": ["lahad datu"],
+    "keningau": ["keningau"],
+    "kudat": ["kudat"],
+    "semporna": ["semporna"],
+    "beaufort": ["beaufort"],
+    "kunak": ["kunak"],
+    "tongod": ["tongod"],
+    "kota marudu": ["kota marudu"],
+    "pitas": ["pitas"],
+    "beluran": ["beluran"],
+    "kinabatangan": ["kinabatangan", "kota kinabatangan"],
+    "tuaran": ["tuaran"],
+    "papar": ["papar"],
+    "penampang": ["penampang"],
+    "putatan": ["putatan"],
+    "ranau": ["ranau"],
+    "kota belud": ["kota belud"],
+    "sipitang": ["sipitang"],
+    "tenom": ["tenom"],
+    "tambunan": ["tambunan"],
+    "nabawan": ["nabawan"],
+    "sook": ["sook"],
+    "pensiangan": ["pensiangan"],
+    "matunggong": ["matunggong"],
+    "kalabakan": ["kalabakan"],
+    "sugut": ["sugut"],
+    "telupid": ["telupid"],
+    "kuala penyu": ["kuala penyu"],
+    "membakut": ["membakut"],
+    "bongawan": ["bongawan"],
+    # Federal territory, but usually reported together with Sabah
+    "labuan": ["labuan"],
+
+    # --- Key Suburbs / Areas (KK & surrounds) ---
+    "inanam": ["inanam"],
+    "likas": ["likas"],
+    "luyang": ["luyang"],
+    "menggatal": ["menggatal"],
+    "sepanggar": ["sepanggar"],
+    "telipok": ["telipok"],
+    "kingfisher": ["kingfisher"],
+    "donggongon": ["donggongon"],
+    "bundusan": ["bundusan"],
+    "lok kawi": ["lok kawi"],
+    "moyog": ["moyog"],
+    "kimanis": ["kimanis"],
+    "kinarut": ["kinarut"],
+    "weston": ["weston"],
+    "kundasang": ["kundasang"],
+    "kuala abai": ["kuala abai"],
+    "lumadan": ["lumadan"],
+    "klias": ["klias"],
+    "pandasan": ["pandasan"],
+    "tanjung aru": ["tanjung aru"],
+    "signal hill": ["signal hill"],
+
+    # --- Rivers (flood-prone), often referenced without the word "sungai" ---
+    "sungai kinabatangan": ["sungai kinabatangan"],
+    "sungai segama": ["sungai segama"],
+    "sungai kalabakan": ["sungai kalabakan"],
+    "sungai padas": ["sungai padas", "padas"],
+    "sungai papar": ["sungai papar"],
+    "sungai tuaran": ["sungai tuaran"],
+    "sungai labuk": ["sungai labuk", "labuk"],
+    "sungai sugut": ["sungai sugut"],
+    "sungai liwagu": ["sungai liwagu", "liwagu"],
+    "sungai moyog": ["sungai moyog"],
+    "sungai pegalan": ["sungai pegalan", "pegalan"],
+    "sungai membakut": ["sungai membakut"],
+
+    # --- Islands & Coastal Villages ---
+    "pulau gaya": ["pulau gaya", "gaya island"],
+    "pulau manukan": ["pulau manukan", "manukan island"],
+    "pulau sapi": ["pulau sapi"],
+    "pulau mamutik": ["pulau mamutik"],
+    "mantanani": ["mantanani"],
+    "banggi": ["banggi"],
+    "balambangan": ["balambangan"],
+    "mabul": ["mabul"],
+    "kapalai": ["kapalai"],
+    "sibuan": ["sibuan"],
+    "pom pom": ["pom pom"],
+    "mataking": ["mataking"],
+    "kampung nelayan": ["kampung nelayan", "kg nelayan"],
+    "kampung air": ["kampung air", "kg air"],
+
+    # --- Interior ---
+    "maliau": ["maliau"],
+    "danum valley": ["danum valley"],
+    "crocker range": ["crocker range"],
+    "kinabalu park": ["kinabalu park"],
+    "deramakot": ["deramakot"],
+    "ulu segama": ["ulu segama"],
+    "tabin": ["tabin"],
+    "kulamba": ["kulamba"],
+}
+
+# Every alias, in table order
+SABAH_LOCATION_ALIASES = [alias for aliases in SABAH_LOCATIONS.values() for alias in aliases]
+
+GazetteerMatch = namedtuple('GazetteerMatch', ['start', 'end', 'text', 'location_id', 'hashtag'])
+
+_TOKEN_RE = re.compile(r'\w+')
+_WORD_CHAR_RE = re.compile(r'\w')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+class Gazetteer:
+    """Aho-Corasick matcher over word tokens for a fixed set of names."""
+
+    def __init__(self, entries):
+        """Build the automaton from (alias, location_id) pairs."""
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        self._max_tokens = 1
+        self.aliases = {}
+
+        for alias, location_id in entries:
+            self._add(alias, location_id)
+
+        self._build_failure_links()
+
+    @classmethod
+    def from_locations(cls, locations):
+        """Build from a {location_id: [aliases]} table."""
+        return cls((alias, location_id) for location_id, aliases in locations.items() for alias in aliases)
+
+    @classmethod
+    def from_keywords(cls, keywords):
+        """Build from a flat keyword list; each keyword is its own id."""
+        return cls((keyword, keyword.lower()) for keyword in keywords)
+
+    def _add(self, alias, location_id):
+        """Insert one alias into the token trie."""
+        core = _WHITESPACE_RE.sub(' ', alias.strip().lower()).lstrip('#')
+        tokens = _TOKEN_RE.findall(core)
+        if not tokens:
+            return
+
+        # Separators between tokens and punctuation after the alias
+        # ('kota kinabalu', 'k.k.', 'api-api') are not part of the token
+        # stream, so multi-token aliases are re-checked against the raw text
+        trailing = core[core.rfind(tokens[-1]) + len(tokens[-1]):]
+        exact = core[:len(core) - len(trailing)] if trailing else core
+        needs_check = bool(trailing) or len(tokens) > 1
+
+        state = 0
+        for token in tokens:
+            state = self._goto[state].setdefault(token, len(self._goto))
+            if state == len(self._goto):
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+
+        if core in self.aliases:
+            return
+        self.aliases[core] = location_id
+        self._output[state].append((len(tokens), location_id, exact, trailing, needs_check))
+        self._max_tokens = max(self._max_tokens, len(tokens))
+
+    def _build_failure_links(self):
+        """Breadth-first pass linking each state to its longest proper suffix state."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def _scan(self, text):
+        """Yield every match in a single pass over the text's word tokens."""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        starts = deque(maxlen=self._max_tokens)
+        state = 0
+
+        for m in _TOKEN_RE.finditer(text):
+            token = m.group().lower()
+            starts.append(m.start())
+
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+
+            for n_tokens, location_id, exact, trailing, needs_check in output[state]:
+                start = starts[-n_tokens]
+                end = m.end()
+                if needs_check:
+                    if _WHITESPACE_RE.sub(' ', text[start:end].lower()) != exact:
+                        continue
+                    if trailing:
+                        if text[end:end + len(trailing)] != trailing:
+                            continue
+                        end += len(trailing)
+                        if _WORD_CHAR_RE.match(text, end):
+                            continue
+                hashtag = start > 0 and text[start - 1] == '#'
+                yield GazetteerMatch(start - hashtag, end, text[start:end], location_id, hashtag)
+
+    def find_all(self, text):
+        """Return all (possibly overlapping) matches ordered by position, longest first."""
+        if not text:
+            return []
+        return sorted(self._scan(text), key=lambda match: (match.start, -match.end))
+
+    def search(self, text):
+        """Return the leftmost-longest match, or None."""
+        matches = self.find_all(text)
+        return matches[0] if matches else None
+
+    def match(self, text):
+        """Return the first match the scan reaches, or None; stops early."""
+        if not text:
+            return None
+        for match in self._scan(text):
+            return match
+        return None
+
+    def contains(self, text):
+        """Check whether the text mentions any name."""
+        return self.match(text) is not None
+
+    def mentioned_ids(self, text):
+        """Return the distinct location ids of the non-overlapping leftmost-longest matches, in order.
+
+        A name nested in a longer one ('kinabatangan' in 'sungai kinabatangan')
+        is not a separate mention, as with a regex alternation scan.
+        """
+        ids = []
+        end = 0
+        for match in self.find_all(text):
+            if match.start < end:
+                continue
+            end = match.end
+            if match.location_id not in ids:
+                ids.append(match.location_id)
+        return ids
+
+    def location_ids(self, text):
+        """Return the distinct location ids mentioned in the text, in order of appearance."""
+        return list(dict.fromkeys(match.location_id for match in self.find_all(text)))
+
+
+# Built once at import and shared by every caller
+SABAH_GAZETTEER = Gazetteer.from_locations(SABAH_LOCATIONS)
+
+
+# Distinct keyword sets seen by keyword_matcher; each one is compiled once
+KEYWORD_MATCHER_CACHE_SIZE = 32
+
+
+@lru_cache(maxsize=KEYWORD_MATCHER_CACHE_SIZE)
+def _build_keyword_matcher(keywords):
+    return Gazetteer.from_keywords(keywords)
+
+
+def keyword_matcher(keywords):
+    """Return the compiled matcher for a keyword list, reusing it for repeat lists."""
+    return _build_keyword_matcher(tuple(keywords))
@@ -2,6 +2,7 @@ import mysql.connector
 from mysql.connector import Error
 import os
 from dotenv import load_dotenv
+from connection_pool import shared_pool, PoolTimeout
 
 # Load environment variables
 load_dotenv()
@@ -15,19 +16,25 @@ DB_CONFIG = {
 }
 
 
+def open_db_connection():
+    return mysql.connector.connect(**DB_CONFIG)
+
+
+def db_pool():
+    return shared_pool('mysql', open_db_connection, name='mysql')
+
+
 def get_db_connection():
-    """Create and return a MySQL database connection"""
+    """Check out a pooled MySQL database connection; close() returns it to the pool"""
     try:
-        connection = mysql.connector.connect(**DB_CONFIG)
-        if connection.is_connected():
-            return connection
-    except Error as e:
+        return db_pool().checkout()
+    except (Error, PoolTimeout) as e:
         print(f"Error connecting to MySQL database: {e}")
         return None
 
 def close_db_connection(connection):
-    """Close database connection"""
-    if connection and connection.is_connected():
+    """Return a database connection to the pool"""
+    if connection:
         connection.close()
 
 
@@ -69,7 +76,7 @@ def init_db():
     conn.close()
 
 def save_to_db(post):
-    conn = mysql.connector.connect(**DB_CONFIG)
+    conn = db_pool().checkout()
     c = conn.cursor()
     try:
         c.execute('''
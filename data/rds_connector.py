@@ -2,6 +2,7 @@ import pymysql
 import os
 import logging
 from dotenv import load_dotenv
+from connection_pool import shared_pool
 
 load_dotenv(os.path.join(os.path.dirname(__file__), '../.env'))
 
@@ -9,7 +10,7 @@ load_dotenv(os.path.join(os.path.dirname(__file__), '../.env'))
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def get_rds_connection():
+def open_rds_connection(local_infile=False):
     """Connect to AWS RDS MySQL database"""
     try:
         connection = pymysql.connect(
@@ -23,7 +24,8 @@ def get_rds_connection():
             autocommit=False,
             connect_timeout=30,
             read_timeout=30,
-            write_timeout=30
+            write_timeout=30,
+            local_infile=local_infile
         )
         logger.info("Successfully connected to RDS")
         return connection
@@ -31,6 +33,13 @@ def get_rds_connection():
         logger.error(f"RDS connection failed: {e}")
         raise
 
+def get_rds_connection():
+    """Check out a pooled RDS connection; close() returns it to the pool"""
+    return rds_pool().checkout()
+
+def rds_pool():
+    return shared_pool('rds', open_rds_connection, name='rds')
+
 def execute_query(query, params=None):
     """Execute query and return results"""
     connection = get_rds_connection()
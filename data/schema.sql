@@ -1,7 +1,9 @@
 -- Drop tables if they exist (in reverse dependency order)
 DROP TABLE IF EXISTS assessment;
 DROP TABLE IF EXISTS postkeyword;
+DROP TABLE IF EXISTS postlocation;
 DROP TABLE IF EXISTS x_post;
+DROP TABLE IF EXISTS location_alias;
 DROP TABLE IF EXISTS official_announcement;
 DROP TABLE IF EXISTS meteorological_alert;
 DROP TABLE IF EXISTS distress_calls;
@@ -28,6 +30,14 @@ CREATE TABLE location (
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Spellings each location is mentioned by, mirrored from data/gazetteer.py
+-- by sync_locations.py and read by the Lambda's location resolver
+CREATE TABLE location_alias (
+    alias VARCHAR(100) NOT NULL PRIMARY KEY,
+    location_id INT NOT NULL,
+    FOREIGN KEY (location_id) REFERENCES location(location_id) ON DELETE CASCADE
+);
+
 -- Sources table
 CREATE TABLE source (
     source_id INT AUTO_INCREMENT PRIMARY KEY,
@@ -72,6 +82,7 @@ CREATE TABLE meteorological_alert (
     status VARCHAR(20) NOT NULL DEFAULT 'ACTIVE',
     source_url VARCHAR(500),
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    content_hash CHAR(64),
     FOREIGN KEY (location_id) REFERENCES location(location_id),
     UNIQUE KEY unique_location_date (location_id, issued_at)
 );
@@ -103,6 +114,17 @@ CREATE TABLE postkeyword (
     FOREIGN KEY (keyword_id) REFERENCES keyword(keyword_id) ON DELETE CASCADE
 );
 
+-- Junction table for every location a post mentions; x_post.location_id
+-- keeps the first one
+CREATE TABLE postlocation (
+    x_post_id INT,
+    location_id INT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (x_post_id, location_id),
+    FOREIGN KEY (x_post_id) REFERENCES x_post(x_post_id) ON DELETE CASCADE,
+    FOREIGN KEY (location_id) REFERENCES location(location_id) ON DELETE CASCADE
+);
+
 -- Assessment table
 CREATE TABLE assessment (
     assessment_id INT AUTO_INCREMENT PRIMARY KEY,
@@ -134,6 +156,8 @@ CREATE INDEX idx_x_post_location ON x_post(location_id);
 CREATE INDEX idx_x_post_scraped_at ON x_post(scraped_at);
 CREATE INDEX idx_x_post_original_id ON x_post(original_id);
 
+CREATE INDEX idx_postlocation_location ON postlocation(location_id, x_post_id);
+
 CREATE INDEX idx_met_alert_issued_at ON meteorological_alert(issued_at);
 CREATE INDEX idx_met_alert_status ON meteorological_alert(status);
 CREATE INDEX idx_met_alert_severity ON meteorological_alert(severity_level);
@@ -0,0 +1,156 @@
+import os
+import json
+import time
+import functools
+import threading
+from collections import Counter
+
+# Append each run's summary here as one JSON line, for comparing runs
+METRICS_FILE = os.environ.get('X_METRICS_JSON')
+
+_local = threading.local()
+
+
+class RunMetrics:
+    """Phase timers and counters for one scrape run.
+
+    Phase times are exclusive: time spent in a nested phase (cookie
+    validation inside cookie loading) is only counted once, under the
+    innermost phase, so the phases add up to the time they cover.
+    """
+
+    def __init__(self, query=None):
+        self.query = query
+        self.started = time.perf_counter()
+        self.scrape_seconds = None
+        self.tweets = 0
+        self.phase_seconds = Counter()
+        self.phase_calls = Counter()
+        self.counters = Counter()
+        self.webdriver_commands = Counter()
+        self._stack = []
+
+    def phase_start(self, name):
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def phase_end(self):
+        name, start, child_seconds = self._stack.pop()
+        elapsed = time.perf_counter() - start
+        self.phase_seconds[name] += elapsed - child_seconds
+        self.phase_calls[name] += 1
+        if self._stack:
+            self._stack[-1][2] += elapsed
+
+    def add_phase(self, name, seconds, calls=1):
+        """Record time measured elsewhere, e.g. on the background writer thread."""
+        self.phase_seconds[name] += seconds
+        self.phase_calls[name] += calls
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def webdriver_call(self, command):
+        self.webdriver_commands[command] += 1
+
+    def finish_scrape(self, tweets):
+        self.scrape_seconds = time.perf_counter() - self.started
+        self.tweets = tweets
+
+    def summary(self):
+        wall = time.perf_counter() - self.started
+        scrape = self.scrape_seconds if self.scrape_seconds is not None else wall
+        calls = sum(self.webdriver_commands.values())
+        parsed = self.counters['articles_parsed']
+        return {
+            'query': self.query,
+            'tweets': self.tweets,
+            'wall_seconds': round(wall, 3),
+            'scrape_seconds': round(scrape, 3),
+            'tweets_per_second': round(self.tweets / scrape, 3) if scrape else 0.0,
+            'webdriver_calls': calls,
+            'webdriver_calls_per_tweet': round(calls / self.tweets, 2) if self.tweets else None,
+            'webdriver_commands': dict(self.webdriver_commands.most_common(10)),
+            'articles_parsed': parsed,
+            'stale_elements': self.counters['stale_elements'],
+            'stale_element_rate': round(self.counters['stale_elements'] / parsed, 4) if parsed else 0.0,
+            'phases': {
+                name: {'seconds': round(seconds, 3), 'calls': self.phase_calls[name]}
+                for name, seconds in self.phase_seconds.most_common()
+            },
+            'counters': dict(self.counters)
+        }
+
+    def emit(self, path=METRICS_FILE):
+        """Print the summary as JSON and, if configured, append it to the metrics file."""
+        summary = self.summary()
+        print(json.dumps(summary, indent=2))
+        if path:
+            try:
+                with open(path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(summary) + '\n')
+            except IOError as e:
+                print(f"Error writing metrics: {e}")
+        return summary
+
+
+def start_run(query=None):
+    """Begin a new run on this thread; later phases and counts go to it."""
+    _local.run = RunMetrics(query)
+    return _local.run
+
+
+def current():
+    """Return this thread's run, starting one if none is active."""
+    run = getattr(_local, 'run', None)
+    if run is None:
+        run = start_run()
+    return run
+
+
+class phase:
+    """Time a block as a named phase: with phase('scroll_wait'): ..."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.run = current()
+        self.run.phase_start(self.name)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.run.phase_end()
+        return False
+
+
+def timed(name):
+    """Decorator form of phase()."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name, n=1):
+    current().count(name, n)
+
+
+def instrument_driver(driver):
+    """Count every WebDriver command the driver sends, element calls included.
+
+    WebElement methods go through their parent driver's execute(), so
+    wrapping it on the instance covers find_element, .text, get_attribute
+    and execute_script alike.
+    """
+    execute = driver.execute
+
+    @functools.wraps(execute)
+    def counted_execute(driver_command, params=None):
+        current().webdriver_call(driver_command)
+        return execute(driver_command, params)
+
+    driver.execute = counted_execute
+    return driver
@@ -0,0 +1,185 @@
+import os
+import sys
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from gazetteer import SABAH_LOCATIONS
+from tweet_fields import StatusIdSet, status_id
+from since_id import SinceId, save_high_water
+from scrape_x import XScrapper, save_tweets_to_rds
+from connection_pool import pool_stats
+
+
+BASE_QUERY = '(banjir OR flood)'
+
+# X rejects search queries much past 500 characters
+MAX_QUERY_LENGTH = 450
+
+
+def _quote(name):
+    return f'"{name}"' if ' ' in name else name
+
+
+def build_location_queries(locations=None, base_query=BASE_QUERY, group_size=6):
+    """Split the search space into targeted queries, a few districts or rivers each.
+
+    Locations are taken in table order, so neighbouring groups (towns,
+    suburbs, rivers, islands) end up in the same query.
+    """
+    names = list(locations or SABAH_LOCATIONS)
+    queries = []
+    group = []
+    for name in names:
+        candidate = group + [name]
+        query = f"{base_query} ({' OR '.join(_quote(n) for n in candidate)})"
+        if group and (len(candidate) > group_size or len(query) > MAX_QUERY_LENGTH):
+            queries.append(f"{base_query} ({' OR '.join(_quote(n) for n in group)})")
+            group = [name]
+        else:
+            group = candidate
+    if group:
+        queries.append(f"{base_query} ({' OR '.join(_quote(n) for n in group)})")
+    return queries
+
+
+class ScrapePool:
+    """Runs several search queries across a bounded pool of browser sessions.
+
+    Every session loads the same cookie file, so only the first one may need
+    a manual login; the rest start once that session has saved fresh cookies.
+    Tweets are deduplicated across all sessions on status id. With
+    incremental set, each query stops at posts stored by an earlier run.
+    """
+
+    def __init__(self, sessions=3, headless=True, extraction='script', block_resources=True, incremental=True):
+        self.sessions = max(1, sessions)
+        self.headless = headless
+        self.extraction = extraction
+        self.block_resources = block_resources
+        self.incremental = incremental
+        self.query_ids = {}
+        self.seen_ids = StatusIdSet()
+        self._local = threading.local()
+        self._scrapers = []
+        self._scrapers_lock = threading.Lock()
+
+    def _scraper(self):
+        """Return this worker thread's scraper, creating it on first use."""
+        scraper = getattr(self._local, 'scraper', None)
+        if scraper is None:
+            scraper = XScrapper(headless=self.headless, block_resources=self.block_resources)
+            self._local.scraper = scraper
+            with self._scrapers_lock:
+                self._scrapers.append(scraper)
+        return scraper
+
+    def _run_query(self, query, limit, must_have_keywords):
+        start = time.time()
+        since = SinceId.load(query) if self.incremental else None
+        alerts = self._scraper().scrape_tweets(query=query, limit=limit, must_have_keywords=must_have_keywords,
+                                               extraction=self.extraction, seen_ids=self.seen_ids, since=since)
+        self.query_ids[query] = [status_id(alert) for alert in alerts]
+        return {
+            'query': query,
+            'count': len(alerts),
+            'elapsed': round(time.time() - start, 2),
+            'session': threading.current_thread().name,
+            'alerts': alerts
+        }
+
+    def run(self, queries, limit_per_query=20, must_have_keywords=None):
+        """Scrape every query; returns (merged alerts, throughput report)."""
+        if must_have_keywords is None:
+            must_have_keywords = ['banjir', 'flood'] + XScrapper.SABAH_LOCATIONS
+
+        start = time.time()
+        results = []
+        queries = list(queries)
+        try:
+            with ThreadPoolExecutor(max_workers=self.sessions, thread_name_prefix='x-session') as pool:
+                # The first query signs in (and saves cookies if a login was
+                # needed) before the other sessions read the cookie file
+                if queries:
+                    results.append(pool.submit(self._run_query, queries[0], limit_per_query,
+                                               must_have_keywords).result())
+                futures = [pool.submit(self._run_query, query, limit_per_query, must_have_keywords)
+                           for query in queries[1:]]
+                for future in futures:
+                    try:
+                        results.append(future.result())
+                    except Exception as e:
+                        print(f"Query failed: {e}")
+        finally:
+            self.cleanup()
+
+        elapsed = time.time() - start
+        alerts = [alert for result in results for alert in result.pop('alerts')]
+        return alerts, self.report(results, elapsed)
+
+    def report(self, results, elapsed):
+        """Merge per-query results into one throughput summary."""
+        sessions = {}
+        for result in results:
+            session = sessions.setdefault(result['session'], {'queries': 0, 'tweets': 0, 'busy_seconds': 0.0})
+            session['queries'] += 1
+            session['tweets'] += result['count']
+            session['busy_seconds'] = round(session['busy_seconds'] + result['elapsed'], 2)
+
+        total = sum(result['count'] for result in results)
+        serial = sum(result['elapsed'] for result in results)
+        return {
+            'queries': len(results),
+            'sessions': len(sessions),
+            'tweets': total,
+            'duplicates_dropped': self.seen_ids.duplicates,
+            'wall_seconds': round(elapsed, 2),
+            'tweets_per_second': round(total / elapsed, 2) if elapsed else 0.0,
+            'session_seconds': round(serial, 2),
+            'parallel_speedup': round(serial / elapsed, 2) if elapsed else 0.0,
+            'per_session': sessions,
+            'db_pools': pool_stats(),
+            'per_query': results
+        }
+
+    def save_high_water(self):
+        """Persist each query's newest id; call once its tweets are stored."""
+        for query, ids in self.query_ids.items():
+            save_high_water(query, ids)
+
+    def cleanup(self):
+        with self._scrapers_lock:
+            scrapers, self._scrapers = self._scrapers, []
+        for scraper in scrapers:
+            scraper.cleanup()
+
+
+def main():
+    """Scrape per-district/river queries in parallel and save the merged result."""
+    sessions = int(os.environ.get('X_SESSIONS', '3'))
+    limit = int(os.environ.get('X_LIMIT_PER_QUERY', '20'))
+    headless = os.environ.get('HEADLESS', '1').strip().lower() in ('1', 'true', 'yes', 'on')
+    extraction = os.environ.get('X_EXTRACTION', 'script').strip().lower()
+
+    queries = build_location_queries()
+    print(f"{len(queries)} queries across {sessions} browser sessions")
+
+    pool = ScrapePool(sessions=sessions, headless=headless, extraction=extraction)
+    alerts, report = pool.run(queries, limit_per_query=limit)
+
+    print(json.dumps({k: v for k, v in report.items() if k != 'per_query'}, indent=2))
+
+    if alerts:
+        try:
+            saved_count = save_tweets_to_rds(alerts)
+            print(f"Saved {saved_count} tweets to database.")
+            pool.save_high_water()
+        except Exception as e:
+            print(f"Error saving to database: {e}")
+    else:
+        print("No results collected.")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
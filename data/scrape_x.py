@@ -10,6 +10,28 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, StaleElementReferenceException, WebDriverException
 from rds_connector import get_rds_connection
+from gazetteer import SABAH_LOCATION_ALIASES, keyword_matcher
+from tweet_fields import extract_first_number, build_tweet_record, status_id, StatusIdSet
+from timeline_capture import TimelineCapture, NetworkEventLog
+from since_id import SinceId, save_high_water
+from tweet_writer import TweetWriter, LocationIds, insert_tweet_batch, ensure_x_source
+import scrape_metrics
+from scrape_metrics import timed, phase
+
+
+def wait_until(condition, timeout=10, initial_interval=0.1, max_interval=1.0):
+    """Poll condition with exponential backoff; return its first truthy result, or None on timeout."""
+    deadline = time.monotonic() + timeout
+    interval = initial_interval
+    while True:
+        result = condition()
+        if result:
+            return result
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        time.sleep(min(interval, remaining))
+        interval = min(interval * 2, max_interval)
 
 
 class XScrapper:
@@ -17,52 +39,27 @@ class XScrapper:
 
     # Constants
     COOKIE_FILE = os.environ.get('X_COOKIES_JSON', 'x_cookies.json')
-    SEARCH_URL_TEMPLATE = 'https://x.com/search?q={q}&src=typed_query&f=live'
-    DEFAULT_DOMAIN = '.x.com'
-    BASE_URL = 'https://x.com/'
+    # Overridable to point the scraper at benchmarks/mock_x_server.py
+    BASE_URL = os.environ.get('X_BASE_URL', 'https://x.com/')
+    SEARCH_URL_TEMPLATE = os.environ.get('X_SEARCH_URL_TEMPLATE', BASE_URL + 'search?q={q}&src=typed_query&f=live')
+    DEFAULT_DOMAIN = os.environ.get('X_COOKIE_DOMAIN', '.x.com')
 
     # Config
-    SABAH_LOCATIONS = [
-        # --- State ---
-        "sabah",
-
-        # --- Major Cities & Towns ---
-        "kota kinabalu", "kk", "sandakan", "tawau", "lahad datu",
-        "keningau", "kudat", "semporna", "beaufort", "kunak", "tongod",
-        "kota marudu", "pitas", "beluran", "kinabatangan", "tuaran",
-        "papar", "penampang", "putatan", "ranau", "kota belud",
-        "sipitang", "tenom", "tambunan", "nabawan", "sook",
-        "pensiangan", "matunggong", "kalabakan", "sugut",
-
-        # --- Key Suburbs / Areas (KK & surrounds) ---
-        "inanam", "likas", "luyang", "menggatal", "sepanggar", "telipok",
-        "kingfisher", "donggongon", "bundusan", "lok kawi", "moyog",
-        "kimanis", "membakut", "weston", "kuala penyu",
-
-        # --- Rivers (flood-prone) ---
-        "sungai kinabatangan", "sungai segama", "sungai kalabakan",
-        "sungai padas", "sungai papar", "sungai tuaran", "sungai labuk",
-        "sungai sugut", "sungai liwagu", "sungai moyog", "sungai pegalan",
-        "sungai membakut",
-        # often referenced without the word "sungai"
-        "kinabatangan", "padas", "labuk", "sugut", "liwagu", "moyog",
-        "pegalan",
-
-        # --- Islands & Coastal Villages ---
-        "gaya island", "manukan island", "mantanani", "banggi",
-        "balambangan", "mabul", "pom pom", "mataking", "tanjung aru",
-        "signal hill",
-
+    SABAH_LOCATIONS = SABAH_LOCATION_ALIASES + [
         # --- Kampungs / Common Phrases ---
-        "kampung nelayan", "kampung air", "kg nelayan", "kg air",
         # generic Malay terms
         "kampung", "kg", "taman", "tmn", "bandar",
         "jalan", "jln", "lorong", "pekan"
     ]
 
-    def __init__(self, headless=False):
+    def __init__(self, headless=False, block_resources=True):
         self.headless = headless
         self.driver = None
+        self.resource_policy = ResourcePolicy() if block_resources else None
+        self.resource_report = None
+        self.metrics = None
+        self.network_log = None
+        self.capture = None
 
     def __enter__(self):
         return self
@@ -78,63 +75,152 @@ class XScrapper:
                 print("Browser closed")
             except Exception:
                 pass
+        self.driver = None
+        self.network_log = None
+        self.capture = None
+
+    def start_session(self, capture_network=False):
+        """Start the browser and sign in; returns False if no session could be established.
+
+        The session stays open for later scrape_tweets calls until cleanup().
+        """
+        self.driver = WebDriverManager.init_driver(self.headless, capture_network=capture_network,
+                                                   resource_policy=self.resource_policy)
+        print("Chrome driver initialized successfully")
+
+        # Chrome only records Network events when timeline capture needs them;
+        # the resource policy counts blocked requests from the same log
+        if capture_network:
+            self.network_log = NetworkEventLog(self.driver)
+            if self.resource_policy:
+                self.network_log.subscribe(self.resource_policy.on_network_event)
+        if self.resource_policy:
+            self.resource_policy.counting = capture_network
+        self.capture = TimelineCapture(self.driver, self.network_log) if capture_network else None
+
+        return self.authenticate()
+
+    def authenticate(self):
+        """Load saved cookies, falling back to a manual login when not headless."""
+        cookies_loaded = CookieManager.load_cookies(self.driver, self.COOKIE_FILE)
+        if not cookies_loaded:
+            print("No valid cookies found or cookies expired.")
+            if self.headless:
+                print("Cannot login in headless mode.")
+                print("Solutions:")
+                print(" 1. Delete x_cookies.json and run with HEADLESS=0")
+                print(" 2. Or run: set HEADLESS=0 && python x_webscrape.py")
+                return False
+
+            print("Opening login page...")
+            self.driver.get(self.BASE_URL + 'login')
+
+            if not AuthValidator.wait_for_user_login(self.driver):
+                return False
+
+            print("Saving fresh cookies...")
+            CookieManager.save_cookies(self.driver, self.COOKIE_FILE)
+
+        return True
+
+    def session_alive(self):
+        """Check that the browser from start_session still responds."""
+        if not self.driver:
+            return False
+        try:
+            self.driver.current_url
+            return True
+        except WebDriverException:
+            return False
 
-    def scrape_tweets(self, query='(banjir OR flood) Malaysia', limit=100, must_have_keywords=None):
-        """Main scraping method."""
+    def scrape_tweets(self, query='(banjir OR flood) Malaysia', limit=100, must_have_keywords=None,
+                      extraction='script', snapshot_dir=None, seen_ids=None, since=None):
+        """Main scraping method; returns the matching tweets as a list.
+
+        See iter_tweets for the arguments.
+        """
+        return list(self.iter_tweets(query, limit, must_have_keywords, extraction, snapshot_dir, seen_ids, since))
+
+    def iter_tweets(self, query='(banjir OR flood) Malaysia', limit=100, must_have_keywords=None,
+                    extraction='script', snapshot_dir=None, seen_ids=None, since=None):
+        """Yield matching tweets as they are parsed, while the browser keeps scrolling.
+
+        extraction='script' reads all rendered tweets with one execute_script
+        per scroll pass; extraction='webdriver' walks each article element;
+        extraction='network' decodes the SearchTimeline API responses the
+        page fetches while scrolling and never reads the DOM.
+        snapshot_dir, if set, archives page_source after every pass for
+        offline re-parsing with tweet_snapshot.py.
+
+        The browser is started on the first call and reused afterwards; a
+        reused session is only revalidated when search hits a login wall.
+        seen_ids, a StatusIdSet, lets concurrent sessions share one dedup set.
+        since, a since_id.SinceId, stops scrolling at the first pass that
+        reaches a tweet no newer than the query's stored high-water mark.
+        """
         if must_have_keywords is None:
             must_have_keywords = ['banjir', 'flood']
 
         print(f'Starting Selenium search for: {query}')
-        alerts = []
-        seen_ids = set()
+        collected = 0
+        # Phase timings and WebDriver call counts for this run; see scrape_metrics
+        self.metrics = scrape_metrics.start_run(query)
+        if seen_ids is None:
+            seen_ids = StatusIdSet()
+        harvested = set()
+        keyword_filter = keyword_matcher(must_have_keywords)
 
         try:
-            self.driver = WebDriverManager.init_driver(self.headless)
-            print("Chrome driver initialized successfully")
-
-            # Handle authentication
-            cookies_loaded = CookieManager.load_cookies(self.driver, self.COOKIE_FILE)
-            if not cookies_loaded:
-                print("No valid cookies found or cookies expired.")
-                if self.headless:
-                    print("Cannot login in headless mode.")
-                    print("Solutions:")
-                    print(" 1. Delete x_cookies.json and run with HEADLESS=0")
-                    print(" 2. Or run: set HEADLESS=0 && python x_webscrape.py")
-                    return alerts
-
-                print("Opening login page...")
-                self.driver.get('https://x.com/login')
-                time.sleep(3)
-
-                if not AuthValidator.wait_for_user_login(self.driver):
-                    return alerts
-
-                print("Saving fresh cookies...")
-                CookieManager.save_cookies(self.driver, self.COOKIE_FILE)
+            reused = self.driver is not None
+            if not reused:
+                if not self.start_session(capture_network=(extraction == 'network')):
+                    return
+            elif extraction == 'network' and self.capture is None:
+                print("Session was started without network capture; using script extraction.")
+                extraction = 'script'
+
+            network_log = self.network_log
+            capture = self.capture
+            # Traffic and responses left over from the previous search on a reused session
+            if network_log:
+                network_log.poll()
+            if capture:
+                capture.pending.clear()
+                capture.finished = []
+            if self.resource_policy:
+                self.resource_policy.reset_counts()
 
             # Navigate to search
             search_url = self.SEARCH_URL_TEMPLATE.format(q=quote_plus(query))
             print(f"Navigating to search: {search_url}")
 
             if not AuthValidator.validate_search_access(self.driver, search_url):
-                print("Cannot access search results after authentication.")
-                print("Trying to continue anyway...")
+                if reused and AuthValidator.detect_login_wall(self.driver):
+                    print("Login wall on the reused session. Revalidating cookies...")
+                    if not self.authenticate():
+                        return
+                    if not AuthValidator.validate_search_access(self.driver, search_url):
+                        print("Cannot access search results after revalidation.")
+                        print("Trying to continue anyway...")
+                else:
+                    print("Cannot access search results after authentication.")
+                    print("Trying to continue anyway...")
 
             # Wait for results
             print("Waiting for search results to load...")
             wait = WebDriverWait(self.driver, 15)
             search_loaded = False
 
-            for selector in ['//article[@role="article"]', '//div[@data-testid="searchTimeline"]',
-                             '//div[contains(text(), "No results")]']:
-                try:
-                    wait.until(EC.presence_of_element_located((By.XPATH, selector)))
-                    search_loaded = True
-                    print("Search results loaded successfully")
-                    break
-                except TimeoutException:
-                    continue
+            with phase('results_wait'):
+                for selector in ['//article[@role="article"]', '//div[@data-testid="searchTimeline"]',
+                                 '//div[contains(text(), "No results")]']:
+                    try:
+                        wait.until(EC.presence_of_element_located((By.XPATH, selector)))
+                        search_loaded = True
+                        print("Search results loaded successfully")
+                        break
+                    except TimeoutException:
+                        continue
 
             if not search_loaded:
                 print('Could not detect search results loading.')
@@ -143,29 +229,48 @@ class XScrapper:
             # Scraping loop
             stagnant_scrolls = 0
             max_stagnant = 10
-            scroll_pause = 2
+            pacer = ScrollPacer(self.driver)
 
             print(f"Starting to collect tweets (target: {limit})...")
 
-            while len(alerts) < limit and stagnant_scrolls < max_stagnant:
-                if len(alerts) >= limit:
-                    break
-                # Try multiple selectors for tweets
-                tweet_selectors = [
-                    '//article[@data-testid="tweet"]',
-                    '//div[@data-testid="tweet"]',
-                    '//article[@role="article"]',
-                    '//div[contains(@class, "css-175oi2r") and .//div[@data-testid="tweetText"]]'
-                ]
-
-                articles = []
-                for selector in tweet_selectors:
-                    articles = self.driver.find_elements(By.XPATH, selector)
-                    if articles:
-                        print(f"Found {len(articles)} articles using selector: {selector}")
-                        break
+            while collected < limit and stagnant_scrolls < max_stagnant:
+                self.metrics.count('scroll_passes')
+
+                if snapshot_dir:
+                    self.save_snapshot(snapshot_dir)
+
+                # Keeps the performance log buffer from growing between passes
+                if network_log:
+                    network_log.poll()
+
+                # Status URLs of webdriver articles, marked harvested once parsed
+                article_urls = {}
+
+                # Only tweets rendered since the previous pass are parsed
+                if extraction == 'network':
+                    # Records are already decoded; exact ids, timestamps and counts
+                    with phase('extract'):
+                        articles = capture.collect()
+                    rendered = capture.responses
+                    parse = dict
+                    print(f"Captured {len(articles)} tweets from {capture.responses} timeline responses")
+                elif extraction == 'script':
+                    articles, rendered = TweetParser.extract_articles(self.driver, only_new=True)
+                    parse = TweetParser.parse_tweet_data
+                    print(f"Extracted {len(articles)} new of {rendered} rendered articles")
+                else:
+                    rendered_articles = self.find_articles()
+                    rendered = len(rendered_articles)
+                    articles = []
+                    for art in rendered_articles:
+                        status_url = TweetParser.article_status_url(art)
+                        if status_url and status_url in harvested:
+                            continue
+                        articles.append(art)
+                        article_urls[id(art)] = status_url
+                    parse = TweetParser.parse_tweet
 
-                if not articles:
+                if not rendered:
                     print("No articles found with any selector. Checking page source...")
                     # Debug: Check if we're on the right page
                     current_url = self.driver.current_url
@@ -180,57 +285,89 @@ class XScrapper:
                         print(f"Found testids: {test_ids}")
 
                 new_in_pass = 0
+                reached_known = False
                 for art in articles:
                     try:
-                        data = TweetParser.parse_tweet(art)
+                        self.metrics.count('articles_parsed')
+                        data = parse(art)
+
+                        # The live timeline is newest first; the rest of it is already stored
+                        key = status_id(data)
+                        if since and since.is_known(key):
+                            reached_known = True
+                            continue
 
                         if not data.get('content'):
                             continue
 
+                        # Like the script path: an article whose text had not
+                        # rendered yet (or went stale) is retried next pass
+                        status_url = article_urls.get(id(art))
+                        if status_url:
+                            harvested.add(status_url)
+
                         # Check for keywords
-                        if not TweetParser.contains_keywords(data['content'], must_have_keywords):
+                        with phase('keyword_filter'):
+                            matched = keyword_filter.contains(data['content'])
+                        if not matched:
+                            self.metrics.count('keyword_rejected')
                             continue
 
-                        # Deduplicate by URL
-                        if data.get('url') and data['url'] in seen_ids:
+                        # Deduplicate by status id
+                        if key and not seen_ids.claim(key):
+                            self.metrics.count('duplicates')
                             continue
 
-                        if data.get('url'):
-                            seen_ids.add(data['url'])
-
-                        alerts.append(data)
+                        collected += 1
                         new_in_pass += 1
 
                         content_preview = data['content'][:70] + '...' if len(data['content']) > 70 else data['content']
-                        print(f'[{len(alerts)}/{limit}] @{data.get("username","unknown")}: {content_preview}')
+                        print(f'[{collected}/{limit}] @{data.get("username","unknown")}: {content_preview}')
+
+                        yield data
+
+                        if collected >= limit:
+                            break
 
                     except StaleElementReferenceException:
+                        self.metrics.count('stale_elements')
                         print("Error parsing tweet: stale element reference")
                         continue
                     except Exception as e:
+                        self.metrics.count('parse_errors')
                         print(f"Error parsing tweet: {e}")
                         continue
 
+                if reached_known:
+                    print("Reached tweets stored by an earlier run. Stopping.")
+                    break
+
                 # Handle pagination
                 if new_in_pass == 0:
                     stagnant_scrolls += 1
-                    scroll_pause = min(scroll_pause * 1.2, 5)
                     print(f"No new tweets found. Stagnant scrolls: {stagnant_scrolls}/{max_stagnant}")
                 else:
                     stagnant_scrolls = 0
-                    scroll_pause = 2
 
-                if len(alerts) < limit and stagnant_scrolls < max_stagnant:
-                    self.driver.execute_script('window.scrollTo(0, document.body.scrollHeight);')
-                    time.sleep(scroll_pause)
+                if collected < limit and stagnant_scrolls < max_stagnant:
+                    # Advances as soon as new tweets render or the timeline
+                    # request comes back empty, instead of a fixed 2-5s sleep
+                    with phase('scroll_wait'):
+                        pacer.scroll_and_wait()
 
                     if AuthValidator.detect_login_wall(self.driver):
                         print("Login wall appeared during scraping. Session may have expired.")
                         break
 
-            print(f"\nScraping completed! Collected {len(alerts)} tweets.")
+            print(f"\nScraping completed! Collected {collected} tweets.")
+
+            if self.resource_policy:
+                if network_log:
+                    network_log.poll()
+                self.resource_report = self.resource_policy.report()
+                self.resource_policy.print_report(self.resource_report)
 
-            if len(alerts) == 0:
+            if collected == 0:
                 print("\nTroubleshooting tips:")
                 print("  - Try a different search query")
                 print("  - Ensure your cookies are fresh")
@@ -239,16 +376,48 @@ class XScrapper:
             print(f'WebDriver error: {e}')
         except Exception as e:
             print(f'Unexpected error: {e}')
+        finally:
+            self.metrics.finish_scrape(collected)
 
-        return alerts
+
+    def save_snapshot(self, snapshot_dir):
+        """Write the current page_source to snapshot_dir for offline parsing."""
+        try:
+            os.makedirs(snapshot_dir, exist_ok=True)
+            path = os.path.join(snapshot_dir, f"x_search_{int(time.time() * 1000)}.html")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self.driver.page_source)
+        except (IOError, WebDriverException) as e:
+            print(f"Error saving page snapshot: {e}")
+
+    @timed('extract')
+    def find_articles(self):
+        """Locate tweet article elements, trying selectors from most to least specific."""
+        tweet_selectors = [
+            '//article[@data-testid="tweet"]',
+            '//div[@data-testid="tweet"]',
+            '//article[@role="article"]',
+            '//div[contains(@class, "css-175oi2r") and .//div[@data-testid="tweetText"]]'
+        ]
+
+        for selector in tweet_selectors:
+            articles = self.driver.find_elements(By.XPATH, selector)
+            if articles:
+                print(f"Found {len(articles)} articles using selector: {selector}")
+                return articles
+        return []
 
 
 class WebDriverManager:
     """Handles WebDriver initialization and configuration."""
 
     @staticmethod
-    def init_driver(headless=False):
-        """Initialize Chrome WebDriver with optimized options."""
+    @timed('driver_init')
+    def init_driver(headless=False, capture_network=False, resource_policy=None):
+        """Initialize Chrome WebDriver with optimized options.
+
+        resource_policy, if given, is applied over CDP once the browser is up.
+        """
         try:
             opts = webdriver.ChromeOptions()
 
@@ -267,7 +436,8 @@ class WebDriverManager:
             opts.add_argument('--disable-features=VizDisplayCompositor')
             opts.add_argument('--disable-extensions')
             opts.add_argument('--disable-plugins')
-            opts.add_argument('--disable-images')
+            # Images, video and fonts are blocked by ResourcePolicy; Chrome
+            # has no --disable-images switch
 
             # Anti-detection
             opts.add_argument('--disable-blink-features=AutomationControlled')
@@ -282,8 +452,14 @@ class WebDriverManager:
             opts.add_experimental_option('detach', True)
             opts.page_load_strategy = 'eager'
 
+            # Performance logging enables CDP Network events for TimelineCapture.
+            # It records every request for the whole session, so it stays off
+            # otherwise; blocking itself does not need it
+            if capture_network:
+                opts.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
             service = Service()
-            driver = webdriver.Chrome(service=service, options=opts)
+            driver = scrape_metrics.instrument_driver(webdriver.Chrome(service=service, options=opts))
 
             # Execute anti-detection script
             try:
@@ -294,11 +470,14 @@ class WebDriverManager:
                         Object.defineProperty(navigator, "plugins", {get: () => [1, 2, 3, 4, 5]});
                         Object.defineProperty(navigator, "languages", {get: () => ["en-US", "en"]});
                         window.chrome = {runtime: {}};
-                    '''}
+                    ''' + ScrollPacer.TIMELINE_OBSERVER_SCRIPT}
                 )
             except Exception:
                 pass
 
+            if resource_policy:
+                resource_policy.apply(driver)
+
             return driver
 
         except Exception as e:
@@ -306,6 +485,116 @@ class WebDriverManager:
             raise
 
 
+class ResourcePolicy:
+    """Blocks media the scraper never reads and tallies what was skipped.
+
+    Tweets are read from text nodes and timeline JSON, so photos, avatars,
+    video segments and web fonts are pure transfer cost. Requests are only
+    counted when the session records Network events for timeline capture
+    (X_EXTRACTION=network); a blocked request never starts, so only its
+    count is known, not its size.
+    """
+
+    BLOCKED_URL_PATTERNS = [
+        '*://pbs.twimg.com/media/*',
+        '*://pbs.twimg.com/profile_images/*',
+        '*://pbs.twimg.com/profile_banners/*',
+        '*://pbs.twimg.com/card_img/*',
+        '*://pbs.twimg.com/ext_tw_video_thumb/*',
+        '*://pbs.twimg.com/amplify_video_thumb/*',
+        '*://pbs.twimg.com/tweet_video_thumb/*',
+        '*://video.twimg.com/*',
+        '*://abs.twimg.com/emoji/*',
+        '*://abs.twimg.com/sticky/*',
+        '*.jpg', '*.jpeg', '*.png', '*.gif', '*.webp',
+        '*.mp4', '*.m3u8', '*.m4s',
+        '*.woff', '*.woff2', '*.ttf', '*.otf'
+    ]
+
+    # Chrome's loadingFailed.blockedReason for Network.setBlockedURLs
+    BLOCKED_REASON = 'inspector'
+
+    def __init__(self, patterns=None):
+        self.patterns = list(patterns or self.BLOCKED_URL_PATTERNS)
+        self.applied = False
+        # Set by the scraper when Network events are fed to on_network_event
+        self.counting = False
+        self.request_types = {}
+        self.reset_counts()
+
+    def reset_counts(self):
+        """Start a new report; the block list stays installed."""
+        self.blocked = {}
+        self.loaded_requests = 0
+        self.loaded_bytes = 0
+
+    def apply(self, driver):
+        """Install the block list; returns False if the browser rejected it."""
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.patterns})
+            self.applied = True
+        except Exception as e:
+            print(f"Could not apply resource policy: {e}")
+            self.applied = False
+        return self.applied
+
+    @staticmethod
+    def _resource_type(url, cdp_type):
+        # Video segments are fetched by the player as XHR; count them as media
+        if 'video.twimg.com' in url or url.endswith(('.mp4', '.m3u8', '.m4s')):
+            return 'Media'
+        return cdp_type or 'Other'
+
+    def on_network_event(self, method, params):
+        """NetworkEventLog listener."""
+        request_id = params.get('requestId')
+        if method == 'Network.requestWillBeSent':
+            url = (params.get('request') or {}).get('url', '')
+            self.request_types[request_id] = self._resource_type(url, params.get('type'))
+        elif method == 'Network.loadingFinished':
+            self.request_types.pop(request_id, None)
+            self.loaded_requests += 1
+            self.loaded_bytes += int(params.get('encodedDataLength') or 0)
+        elif method == 'Network.loadingFailed':
+            resource_type = self.request_types.pop(request_id, None) or params.get('type') or 'Other'
+            if params.get('blockedReason') == self.BLOCKED_REASON:
+                self.blocked[resource_type] = self.blocked.get(resource_type, 0) + 1
+
+    def report(self):
+        """Summarise blocked and loaded traffic; request counts only when Network events were read."""
+        if not self.counting:
+            return {
+                'applied': self.applied,
+                'counted': False,
+                'blocked_patterns': len(self.patterns)
+            }
+        return {
+            'applied': self.applied,
+            'counted': True,
+            'blocked_patterns': len(self.patterns),
+            'blocked_requests': sum(self.blocked.values()),
+            'blocked_by_type': dict(self.blocked),
+            'loaded_requests': self.loaded_requests,
+            'loaded_bytes': self.loaded_bytes
+        }
+
+    @staticmethod
+    def print_report(report):
+        if not report['applied']:
+            print("Resource policy was not applied; nothing was blocked.")
+            return
+        if not report['counted']:
+            print(f"Resource policy: blocking {report['blocked_patterns']} URL patterns "
+                  f"(requests are counted with X_EXTRACTION=network)")
+            return
+        by_type = ', '.join(f"{resource_type} {count}"
+                            for resource_type, count in sorted(report['blocked_by_type'].items()))
+        print(f"Resource policy: blocked {report['blocked_requests']} requests ({by_type or 'none'}); "
+              f"loaded {report['loaded_requests']} requests, "
+              f"{report['loaded_bytes'] / 1_000_000:.1f} MB")
+
+
 class CookieManager:
     """Handles cookie operations for authentication."""
 
@@ -333,9 +622,14 @@ class CookieManager:
         if 'sameSite' in raw:
             ck['sameSite'] = raw['sameSite']
 
+        # No domain means the current page's host (e.g. a local mock server)
+        if not ck['domain']:
+            del ck['domain']
+
         return ck
 
     @staticmethod
+    @timed('cookie_load')
     def load_cookies(driver, cookie_path):
         """Load cookies from file."""
         if not os.path.exists(cookie_path):
@@ -353,8 +647,9 @@ class CookieManager:
             print(f'Cookie file {cookie_path} is invalid or empty.')
             return False
 
+        # With the 'eager' load strategy get() returns once the document is
+        # parsed, which is all add_cookie needs
         driver.get(XScrapper.BASE_URL)
-        time.sleep(2)
 
         total = 0
         for c in cookies:
@@ -368,12 +663,13 @@ class CookieManager:
                 continue
 
         print(f'Loaded {total} cookies from {cookie_path}')
-        driver.refresh()
-        time.sleep(3)
 
+        # validate_cookies navigates to /home, which sends the new cookies;
+        # no separate refresh is needed
         return AuthValidator.validate_cookies(driver)
 
     @staticmethod
+    @timed('cookie_save')
     def save_cookies(driver, cookie_path):
         """Save cookies to file."""
         cookies = driver.get_cookies()
@@ -395,11 +691,11 @@ class AuthValidator:
     """Handles authentication validation."""
 
     @staticmethod
+    @timed('auth_validate')
     def validate_cookies(driver):
         """Validate if cookies provide access to home timeline."""
         try:
-            driver.get('https://x.com/home')
-            time.sleep(3)
+            driver.get(XScrapper.BASE_URL + 'home')
 
             success_indicators = [
                 "//div[@data-testid='primaryColumn']",
@@ -408,11 +704,6 @@ class AuthValidator:
                 "//div[contains(@class,'css-1dbjc4n r-1awozwy r-18u37iz r-1h0z5md')]"
             ]
 
-            for indicator in success_indicators:
-                if driver.find_elements(By.XPATH, indicator):
-                    print("Cookies validated successfully - can access home timeline")
-                    return True
-
             login_indicators = [
                 "//span[contains(text(), 'Sign in to X')]",
                 "//a[contains(@href, '/login')]",
@@ -420,6 +711,14 @@ class AuthValidator:
                 "//input[@name='text' and @autocomplete='username']"
             ]
 
+            # Continue as soon as either outcome has rendered
+            wait_until(lambda: driver.find_elements(By.XPATH, ' | '.join(success_indicators + login_indicators)))
+
+            for indicator in success_indicators:
+                if driver.find_elements(By.XPATH, indicator):
+                    print("Cookies validated successfully - can access home timeline")
+                    return True
+
             for indicator in login_indicators:
                 if driver.find_elements(By.XPATH, indicator):
                     print("Cookies appear invalid - login wall detected")
@@ -432,11 +731,11 @@ class AuthValidator:
             return False
 
     @staticmethod
+    @timed('search_navigate')
     def validate_search_access(driver, search_url):
         """Validate access to search functionality."""
         try:
             driver.get(search_url)
-            time.sleep(3)
 
             search_indicators = [
                 "//div[@data-testid='searchTimeline']",
@@ -444,16 +743,19 @@ class AuthValidator:
                 "//div[contains(text(), 'No results')]"
             ]
 
-            for indicator in search_indicators:
-                if driver.find_elements(By.XPATH, indicator):
-                    return True
-
             login_indicators = [
                 "//span[contains(text(), 'Sign in to X')]",
                 "//a[contains(@href, '/login')]",
                 "//div[contains(text(), 'Log in')]"
             ]
 
+            # Continue as soon as either outcome has rendered
+            wait_until(lambda: driver.find_elements(By.XPATH, ' | '.join(search_indicators + login_indicators)))
+
+            for indicator in search_indicators:
+                if driver.find_elements(By.XPATH, indicator):
+                    return True
+
             for indicator in login_indicators:
                 if driver.find_elements(By.XPATH, indicator):
                     return False
@@ -465,6 +767,7 @@ class AuthValidator:
             return False
 
     @staticmethod
+    @timed('login_wall_check')
     def detect_login_wall(driver):
         """Check if login wall is present."""
         try:
@@ -489,8 +792,7 @@ class AuthValidator:
                 return True
 
             if "search" in current_url and not driver.find_elements(By.XPATH, '//article[@role="article"]'):
-                time.sleep(3)
-                if not driver.find_elements(By.XPATH, '//article[@role="article"]'):
+                if not wait_until(lambda: driver.find_elements(By.XPATH, '//article[@role="article"]'), timeout=3):
                     return True
 
             return False
@@ -499,6 +801,7 @@ class AuthValidator:
             return False
 
     @staticmethod
+    @timed('manual_login')
     def wait_for_user_login(driver, timeout=300):
         """Wait for user to complete login manually."""
         print("\n" + "=" * 60)
@@ -529,40 +832,145 @@ class AuthValidator:
         return False
 
 
+class ScrollPacer:
+    """Scrolls the timeline and waits for the page to respond instead of sleeping."""
+
+    # Counts completed timeline API responses; injected on every new document
+    # by WebDriverManager.init_driver. Resource timing entries are recorded
+    # when a fetch/XHR response has finished downloading.
+    TIMELINE_OBSERVER_SCRIPT = '''
+        window.__floodAlertTimelineResponses = 0;
+        try {
+            new PerformanceObserver(list => {
+                for (const entry of list.getEntries()) {
+                    if (/SearchTimeline|adaptive\\.json/.test(entry.name)) {
+                        window.__floodAlertTimelineResponses += 1;
+                    }
+                }
+            }).observe({type: 'resource', buffered: true});
+        } catch (e) {}
+    '''
+
+    STATE_SCRIPT = '''
+        return [
+            document.querySelectorAll('article[data-testid="tweet"], article[role="article"]').length,
+            window.__floodAlertTimelineResponses || 0
+        ];
+    '''
+
+    def __init__(self, driver, timeout=5, settle=0.5, initial_interval=0.1, max_interval=1.0):
+        self.driver = driver
+        self.timeout = timeout
+        self.settle = settle
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+
+    def state(self):
+        """Return (rendered article count, completed timeline responses)."""
+        try:
+            articles, responses = self.driver.execute_script(self.STATE_SCRIPT)
+            return articles, responses
+        except (WebDriverException, TypeError, ValueError):
+            return 0, 0
+
+    def scroll_and_wait(self):
+        """Scroll to the bottom, then return once new content is present.
+
+        Returns True when the article count changed, False when the timeline
+        request completed without new articles or the timeout ran out.
+        """
+        articles_before, responses_before = self.state()
+        self.driver.execute_script('window.scrollTo(0, document.body.scrollHeight);')
+
+        response_seen_at = None
+
+        def progressed():
+            nonlocal response_seen_at
+            articles, responses = self.state()
+            if articles != articles_before:
+                return 'articles'
+            if responses > responses_before:
+                # The page fetched the next page; give React a moment to
+                # render it before concluding the response was empty
+                if response_seen_at is None:
+                    response_seen_at = time.monotonic()
+                elif time.monotonic() - response_seen_at >= self.settle:
+                    return 'empty'
+            return None
+
+        result = wait_until(progressed, self.timeout, self.initial_interval, self.max_interval)
+        return result == 'articles'
+
+
 class TweetParser:
     """Handles tweet parsing and data extraction."""
 
+    # Reads rendered tweets in one WebDriver round trip; mirrors the
+    # selectors parse_tweet walks element by element. With arguments[0]
+    # set, articles already returned by an earlier call (tagged on the node,
+    # or whose status URL is in the page-lifetime watermark set) are skipped
+    # before any field extraction, so each pass only pays for new tweets.
+    EXTRACT_ARTICLES_SCRIPT = '''
+        const onlyNew = arguments[0];
+        const seen = window.__floodAlertSeen = window.__floodAlertSeen || new Set();
+        let articles = document.querySelectorAll('article[data-testid="tweet"], div[data-testid="tweet"]');
+        if (!articles.length) {
+            articles = document.querySelectorAll('article[role="article"]');
+        }
+        const texts = (root, selector) => Array.from(root.querySelectorAll(selector))
+            .map(el => (el.innerText || '').trim())
+            .filter(Boolean);
+        const metric = (root, selector) => {
+            const container = root.querySelector(selector);
+            return container ? texts(container, 'span') : [];
+        };
+        const results = [];
+        for (const article of articles) {
+            if (onlyNew && article.dataset.floodAlertSeen) {
+                continue;
+            }
+            const time = article.querySelector('time');
+            const timeLink = time ? time.closest('a[href*="/status/"]') : null;
+            const statusLinks = Array.from(article.querySelectorAll('a[href*="/status/"]'));
+            const link = timeLink
+                || statusLinks.find(a => a.href.startsWith('https://'))
+                || statusLinks[0];
+            const href = link ? link.href : '';
+            // X recycles timeline cells, so a re-rendered tweet gets a fresh node
+            if (onlyNew && href && seen.has(href)) {
+                article.dataset.floodAlertSeen = '1';
+                continue;
+            }
+            const handle = article.querySelector('div[data-testid="User-Name"] span[class*="css-1qaijid"]');
+            const record = {
+                text_parts: texts(article, 'div[data-testid="tweetText"] span'),
+                text_blocks: texts(article, 'div[data-testid="tweetText"]'),
+                href: href,
+                handle: handle ? (handle.innerText || '').trim() : '',
+                datetime: time ? (time.getAttribute('datetime') || '') : '',
+                metrics: {
+                    replies: metric(article, 'div[data-testid="reply"]'),
+                    retweets: metric(article, 'div[data-testid="retweet"]'),
+                    likes: metric(article, 'div[data-testid="like"]'),
+                    views: metric(article, 'a[href*="/analytics"]')
+                }
+            };
+            // Only advance the watermark once the tweet text has rendered
+            if (onlyNew && (record.text_parts.length || record.text_blocks.length)) {
+                article.dataset.floodAlertSeen = '1';
+                if (href) {
+                    seen.add(href);
+                }
+            }
+            results.push(record);
+        }
+        return {rendered: articles.length, articles: results};
+    '''
+
     @staticmethod
     def extract_first_number(text):
         """Extract first number from text, handling K/M/B suffixes."""
-        if not text:
-            return 0
-
-        clean_text = text.replace('\u202f', '').replace('\u00a0', ' ').replace('\xa0', ' ')
-        patterns = [
-            r'([\d,]+\.?\d*)[KkMmBb]?',
-            r'([\d,]+)',
-        ]
-
-        for pattern in patterns:
-            m = re.search(pattern, clean_text)
-            if m:
-                try:
-                    num_str = m.group(1).replace(',', '')
-                    num = float(num_str)
-
-                    if 'K' in text.upper():
-                        num *= 1000
-                    elif 'M' in text.upper():
-                        num *= 1000000
-                    elif 'B' in text.upper():
-                        num *= 1000000000
-
-                    return int(num)
-                except (ValueError, AttributeError):
-                    continue
-
-        return 0
+        return extract_first_number(text)
 
     @staticmethod
     def contains_keywords(text, keywords):
@@ -570,13 +978,10 @@ class TweetParser:
         if not text:
             return False
 
-        t = re.sub(r'\s+', ' ', text).lower()
-        escaped = [re.escape(k.lower()) for k in keywords]
-        pattern = re.compile(r'(?<!\w)#?(%s)(?!\w)' % '|'.join(escaped), re.IGNORECASE)
-
-        return bool(pattern.search(t))
+        return keyword_matcher(keywords).contains(text)
 
     @staticmethod
+    @timed('parse')
     def parse_tweet(article):
         """Parse tweet data from article element."""
         data = {
@@ -681,35 +1086,46 @@ class TweetParser:
         return data
 
 
-def save_tweets_to_rds(tweets):
+    @staticmethod
+    @timed('extract')
+    def extract_articles(driver, only_new=False):
+        """Snapshot rendered tweets as plain dicts with a single execute_script call.
+
+        Returns (articles, rendered) where rendered counts every tweet in the DOM.
+        """
+        result = driver.execute_script(TweetParser.EXTRACT_ARTICLES_SCRIPT, only_new) or {}
+        return result.get('articles', []), result.get('rendered', 0)
+
+    @staticmethod
+    def article_status_url(article):
+        """Read an article's status URL without parsing the rest of it."""
+        try:
+            links = article.find_elements(By.XPATH, './/time/ancestor::a[contains(@href,"/status/")]')
+            return links[0].get_attribute('href') if links else None
+        except Exception:
+            return None
+
+    @staticmethod
+    @timed('parse')
+    def parse_tweet_data(raw):
+        """Parse tweet data from a dict produced by extract_articles."""
+        return build_tweet_record(raw)
+
+
+@timed('db_save')
+def save_tweets_to_rds(tweets, batch_size=100):
     """Save tweets to RDS database"""
     conn = get_rds_connection()
+    locations = LocationIds()
     saved = 0
 
     try:
         with conn.cursor() as cursor:
             # Ensure source exists
-            cursor.execute("INSERT IGNORE INTO source (name, type) VALUES ('X', 'SOCIAL_MEDIA')")
-
-            for tweet in tweets:
-                query = """
-                INSERT IGNORE INTO x_post
-                (source_id, original_id, content, post_time, url, likes_count, retweets_count, replies_count, views_count)
-                VALUES (1, %s, %s, NOW(), %s, %s, %s, %s, %s)
-                """
-
-                tweet_id = tweet.get('url', '').split('/')[-1] if tweet.get('url') else str(hash(tweet.get('content', '')))
-
-                cursor.execute(query, (
-                    tweet_id,
-                    tweet.get('content', ''),
-                    tweet.get('url', ''),
-                    tweet.get('likes', 0),
-                    tweet.get('retweets', 0),
-                    tweet.get('replies', 0),
-                    tweet.get('views', 0)
-                ))
-                saved += cursor.rowcount
+            ensure_x_source(cursor)
+
+            for i in range(0, len(tweets), batch_size):
+                saved += insert_tweet_batch(cursor, tweets[i:i + batch_size], locations)
 
             conn.commit()
     finally:
@@ -729,40 +1145,63 @@ def main():
     limit = 10
     headless_env = os.environ.get('HEADLESS', '0').strip().lower()
     headless = headless_env in ('1', 'true', 'yes', 'on')
+    # script (default), webdriver or network
+    extraction = os.environ.get('X_EXTRACTION', 'script').strip().lower()
+    # Set X_BLOCK_RESOURCES=0 to let images, video and fonts load
+    block_resources = os.environ.get('X_BLOCK_RESOURCES', '1').strip().lower() in ('1', 'true', 'yes', 'on')
+    # Set X_INCREMENTAL=0 to rescan the timeline past already-stored tweets
+    incremental = os.environ.get('X_INCREMENTAL', '1').strip().lower() in ('1', 'true', 'yes', 'on')
 
     print(f"Search query: {query}")
     print(f"Target limit: {limit} tweets")
     print(f"Headless mode: {'ON' if headless else 'OFF'}")
+    print(f"Extraction: {extraction}")
+    print(f"Block media: {'ON' if block_resources else 'OFF'}")
+    print(f"Incremental: {'ON' if incremental else 'OFF'}")
     print(f"Cookie file: {XScrapper.COOKIE_FILE}")
     print('=' * 50)
 
     start_time = time.time()
     must_have_keywords = ['banjir', 'flood'] + XScrapper.SABAH_LOCATIONS
+    since = SinceId.load(query) if incremental else None
 
     # Use context manager for proper cleanup
     try:
-        with XScrapper(headless=headless) as scraper:
-            alerts = scraper.scrape_tweets(query=query, limit=limit, must_have_keywords=must_have_keywords)
+        # Tweets are written in batches while the browser keeps scrolling;
+        # only the first few are kept for the summary below
+        collected = 0
+        first_alerts = []
+        with XScrapper(headless=headless, block_resources=block_resources) as scraper, TweetWriter() as writer:
+            for alert in scraper.iter_tweets(query=query, limit=limit, must_have_keywords=must_have_keywords,
+                                             extraction=extraction, since=since):
+                writer.put(alert)
+                collected += 1
+                if len(first_alerts) < 3:
+                    first_alerts.append(alert)
 
         end_time = time.time()
         print(f"\nTotal runtime: {end_time - start_time:.1f} seconds")
 
         # Process results
-        if alerts:
-            print(f"\nFound {len(alerts)} flood-related tweets.")
+        if collected:
+            print(f"\nFound {collected} flood-related tweets.")
 
             # Debug output
             print("\nFirst 3 tweet URLs:")
-            for i, alert in enumerate(alerts[:3]):
+            for i, alert in enumerate(first_alerts):
                 print(f"{i+1}. URL: {alert.get('url', 'NO_URL')}")
                 print(f"   Content: {alert.get('content', '')[:60]}...")
 
-            # Save to database
-            try:
-                saved_count = save_tweets_to_rds(alerts)
-                print(f"Saved {saved_count} tweets to database.")
-            except Exception as e:
-                print(f"Error saving to database: {e}")
+            stats = writer.stats()
+            print(f"Saved {stats['saved']} tweets to database in {stats['batches']} batches "
+                  f"({stats['write_seconds']:.1f}s writing).")
+            if writer.failed:
+                print(f"Error saving to database: {writer.failed} tweets not written ({writer.errors[-1]})")
+            elif incremental and writer.newest_id:
+                save_high_water(query, [writer.newest_id])
+
+            # Overlaps the scrape; reported separately from the scraper's own phases
+            scraper.metrics.add_phase('db_write_background', writer.write_seconds, writer.batches)
         else:
             print("No results collected.")
             print("\nNext steps:")
@@ -771,6 +1210,10 @@ def main():
             print("  3. Log in manually when browser opens")
             print("  4. Wait for automatic continuation")
 
+        if scraper.metrics:
+            print("\nRun metrics:")
+            scraper.metrics.emit()
+
     except Exception as e:
         print(f"Fatal error in main: {e}")
 
@@ -0,0 +1,237 @@
+import os
+import sys
+import json
+import time
+import queue
+import socket
+import socketserver
+import threading
+from scrape_x import XScrapper, save_tweets_to_rds
+from tweet_fields import status_id
+from since_id import SinceId, save_high_water
+from connection_pool import pool_stats
+
+
+HOST = os.environ.get('X_DAEMON_HOST', '127.0.0.1')
+PORT = int(os.environ.get('X_DAEMON_PORT', '8765'))
+
+DEFAULT_QUERY = '(banjir OR flood) Malaysia'
+DEFAULT_LIMIT = 10
+
+# Seconds an idle daemon waits between browser liveness checks
+LIVENESS_INTERVAL = float(os.environ.get('X_DAEMON_LIVENESS_INTERVAL', '60'))
+
+
+class ScraperDaemon:
+    """Keeps one signed-in browser open and runs search jobs against it in order.
+
+    Jobs arrive as JSON lines on a local TCP socket:
+
+        {"action": "search", "query": "...", "limit": 10, "save": true, "incremental": true}
+        {"action": "ping"}
+        {"action": "shutdown"}
+
+    Each connection gets one JSON line back. The browser is not thread-safe,
+    so connection handlers only enqueue jobs; serve_forever() runs them on
+    the calling thread. Ping answers from state that thread records (the
+    last liveness check and job) without touching the browser.
+    """
+
+    def __init__(self, headless=True, extraction='script', block_resources=True, host=HOST, port=PORT):
+        self.scraper = XScrapper(headless=headless, block_resources=block_resources)
+        self.extraction = extraction
+        self.host = host
+        self.port = port
+        self.jobs = queue.Queue()
+        self.jobs_done = 0
+        self.started_at = None
+        self.server = None
+        # Written by the job thread only, read by ping handlers
+        self.session_alive = False
+        self.session_checked_at = None
+        self.current_query = None
+        self.last_job_ended_at = None
+
+    def _make_server(self):
+        daemon = self
+
+        class JobHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                try:
+                    job = json.loads(self.rfile.readline().decode('utf-8') or '{}')
+                except ValueError as e:
+                    self._reply({'status': 'error', 'error': f'Invalid JSON: {e}'})
+                    return
+
+                if job.get('action', 'search') == 'ping':
+                    self._reply(daemon.status())
+                    return
+
+                reply = queue.Queue(maxsize=1)
+                daemon.jobs.put((job, reply))
+                self._reply(reply.get())
+
+            def _reply(self, payload):
+                self.wfile.write((json.dumps(payload, ensure_ascii=False) + '\n').encode('utf-8'))
+
+        server = socketserver.ThreadingTCPServer((self.host, self.port), JobHandler, bind_and_activate=False)
+        server.allow_reuse_address = True
+        server.daemon_threads = True
+        server.server_bind()
+        server.server_activate()
+        return server
+
+    def status(self):
+        """Ping payload, built from recorded state so it never waits on the browser."""
+        now = time.time()
+        return {
+            'status': 'ok',
+            'jobs_done': self.jobs_done,
+            'queued': self.jobs.qsize(),
+            'busy': self.current_query is not None,
+            'current_query': self.current_query,
+            'session_alive': self.session_alive,
+            'session_checked_ago': round(now - self.session_checked_at, 1) if self.session_checked_at else None,
+            'last_job_ago': round(now - self.last_job_ended_at, 1) if self.last_job_ended_at else None,
+            'db_pools': pool_stats(),
+            'uptime': round(now - self.started_at, 1)
+        }
+
+    def check_session(self):
+        """Probe the browser (job thread only) and record the result for ping."""
+        self.session_alive = self.scraper.session_alive()
+        self.session_checked_at = time.time()
+        return self.session_alive
+
+    def run_job(self, job):
+        """Run one search on the warm session and return the reply payload."""
+        if not self.check_session() and self.scraper.driver:
+            print("Browser session was lost; starting a new one.")
+            self.scraper.cleanup()
+
+        query = job.get('query') or DEFAULT_QUERY
+        limit = int(job.get('limit') or DEFAULT_LIMIT)
+        keywords = job.get('keywords') or ['banjir', 'flood'] + XScrapper.SABAH_LOCATIONS
+
+        incremental = job.get('incremental', True)
+        since = SinceId.load(query) if incremental else None
+
+        start = time.time()
+        alerts = self.scraper.scrape_tweets(query=query, limit=limit, must_have_keywords=keywords,
+                                            extraction=self.extraction, since=since)
+        result = {
+            'status': 'ok',
+            'query': query,
+            'count': len(alerts),
+            'elapsed': round(time.time() - start, 2),
+            'resources': self.scraper.resource_report
+        }
+
+        if job.get('save', True) and alerts:
+            try:
+                result['saved'] = save_tweets_to_rds(alerts)
+                if incremental:
+                    save_high_water(query, [status_id(alert) for alert in alerts])
+            except Exception as e:
+                result['save_error'] = str(e)
+
+        if self.scraper.metrics:
+            result['metrics'] = self.scraper.metrics.summary()
+
+        if job.get('return_tweets'):
+            result['tweets'] = alerts
+
+        return result
+
+    def serve_forever(self):
+        """Start the browser, listen for jobs and run them until a shutdown job arrives."""
+        self.started_at = time.time()
+        if not self.scraper.start_session(capture_network=(self.extraction == 'network')):
+            print("Could not establish an authenticated session; daemon not started.")
+            self.scraper.cleanup()
+            return False
+        self.check_session()
+
+        self.server = self._make_server()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"Scraper daemon listening on {self.host}:{self.port}")
+
+        try:
+            while True:
+                try:
+                    job, reply = self.jobs.get(timeout=LIVENESS_INTERVAL)
+                except queue.Empty:
+                    # Idle: refresh the state ping reports
+                    self.check_session()
+                    continue
+                if job.get('action') == 'shutdown':
+                    reply.put({'status': 'ok', 'jobs_done': self.jobs_done})
+                    break
+                self.current_query = job.get('query') or DEFAULT_QUERY
+                try:
+                    reply.put(self.run_job(job))
+                except Exception as e:
+                    reply.put({'status': 'error', 'error': str(e)})
+                finally:
+                    self.current_query = None
+                    self.last_job_ended_at = time.time()
+                self.jobs_done += 1
+                self.check_session()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.server.shutdown()
+            self.server.server_close()
+            self.scraper.cleanup()
+            print("Scraper daemon stopped")
+
+        return True
+
+
+def submit_job(job, host=HOST, port=PORT, timeout=600):
+    """Send one job to a running daemon and return its reply."""
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.sendall((json.dumps(job) + '\n').encode('utf-8'))
+        with sock.makefile('r', encoding='utf-8') as f:
+            return json.loads(f.readline())
+
+
+def main():
+    """python scraper_daemon.py serve | search [query] [--limit N] [--no-save] | ping | stop"""
+    args = sys.argv[1:]
+    command = args.pop(0) if args else 'serve'
+
+    if command == 'serve':
+        headless_env = os.environ.get('HEADLESS', '1').strip().lower()
+        extraction = os.environ.get('X_EXTRACTION', 'script').strip().lower()
+        block_resources = os.environ.get('X_BLOCK_RESOURCES', '1').strip().lower() in ('1', 'true', 'yes', 'on')
+        daemon = ScraperDaemon(headless=headless_env in ('1', 'true', 'yes', 'on'),
+                               extraction=extraction, block_resources=block_resources)
+        sys.exit(0 if daemon.serve_forever() else 1)
+
+    if command == 'search':
+        job = {'action': 'search', 'save': '--no-save' not in args}
+        args = [a for a in args if a != '--no-save']
+        if '--limit' in args:
+            i = args.index('--limit')
+            job['limit'] = int(args[i + 1])
+            del args[i:i + 2]
+        if args:
+            job['query'] = ' '.join(args)
+    elif command == 'ping':
+        job = {'action': 'ping'}
+    elif command == 'stop':
+        job = {'action': 'shutdown'}
+    else:
+        print(main.__doc__, file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        print(json.dumps(submit_job(job), ensure_ascii=False, indent=2))
+    except OSError as e:
+        print(f"Could not reach scraper daemon on {HOST}:{PORT}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
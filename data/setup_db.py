@@ -1,6 +1,7 @@
 import mysql.connector
 import os
 from dotenv import load_dotenv
+from sync_locations import sync_location_aliases
 
 load_dotenv()
 
@@ -35,6 +36,9 @@ def setup_database():
                         print(f"Error executing statement: {e}")
                         print(f"Statement: {statement[:100]}...")
 
+        # Gazetteer locations and aliases, shared with the Lambda resolver
+        print(f"Synced {sync_location_aliases(cur)} location aliases")
+
         conn.commit()
         print("Database setup completed successfully!")
 
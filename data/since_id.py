@@ -0,0 +1,78 @@
+import os
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+HIGH_WATER_FILE = os.environ.get('X_HIGH_WATER_JSON', 'x_high_water.json')
+
+# Smaller numbers are the millisecond timestamps build_tweet_record makes up
+# for tweets without a status link, not snowflake ids
+MIN_SNOWFLAKE_ID = 10 ** 15
+
+
+def _numeric(key):
+    return int(key) if key and str(key).isdigit() else None
+
+
+def load_high_water(query, path=HIGH_WATER_FILE):
+    """Return the highest status id stored by an earlier run of this query, or None."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            marks = json.load(f)
+    except (IOError, ValueError):
+        return None
+    return _numeric(marks.get(query))
+
+
+def save_high_water(query, ids, path=HIGH_WATER_FILE):
+    """Raise this query's high-water mark to the largest numeric id in ids."""
+    newest = max(filter(None, (_numeric(key) for key in ids)), default=None)
+    if newest is None:
+        return None
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            marks = json.load(f)
+    except (IOError, ValueError):
+        marks = {}
+
+    current = _numeric(marks.get(query))
+    if current is not None and current >= newest:
+        return current
+
+    marks[query] = str(newest)
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(marks, f, indent=2)
+    except IOError as e:
+        logger.error(f"Error saving high-water mark: {e}")
+    return newest
+
+
+class SinceId:
+    """Decides when a newest-first timeline has scrolled back into stored posts.
+
+    A status id is known if it is no newer than the query's persisted
+    high-water mark. Snowflake ids grow with post time, so everything below
+    the mark was seen by an earlier run of the same query. Posts stored by
+    other queries do not count: a query new to the pool still walks back
+    through tweets that overlapping queries already saved.
+    """
+
+    def __init__(self, high_water=None):
+        self.high_water = high_water
+
+    @classmethod
+    def load(cls, query, path=HIGH_WATER_FILE):
+        """Build from the query's persisted mark, if it has one."""
+        return cls(load_high_water(query, path))
+
+    def __bool__(self):
+        return self.high_water is not None
+
+    def is_known(self, key):
+        numeric = _numeric(key)
+        if numeric is None or numeric < MIN_SNOWFLAKE_ID or self.high_water is None:
+            return False
+        return numeric <= self.high_water
@@ -0,0 +1,97 @@
+"""Mirror the gazetteer into the location and location_alias tables.
+
+gazetteer.SABAH_LOCATIONS is the one list of place names and aliases. The
+data/ writers match it directly; the Lambda resolver reads the same
+aliases back from location_alias, so a tweet gets the same location_id
+whichever path stores it. Databases built before location_alias and
+postlocation were in schema.sql get both tables. Rerun after editing the
+gazetteer:
+
+    python sync_locations.py
+"""
+from gazetteer import SABAH_LOCATIONS
+from rds_connector import get_rds_connection
+
+CREATE_LOCATION_ALIAS = """
+CREATE TABLE IF NOT EXISTS location_alias (
+    alias VARCHAR(100) NOT NULL PRIMARY KEY,
+    location_id INT NOT NULL,
+    FOREIGN KEY (location_id) REFERENCES location(location_id) ON DELETE CASCADE
+)"""
+
+CREATE_POSTLOCATION = """
+CREATE TABLE IF NOT EXISTS postlocation (
+    x_post_id INT,
+    location_id INT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (x_post_id, location_id),
+    FOREIGN KEY (x_post_id) REFERENCES x_post(x_post_id) ON DELETE CASCADE,
+    FOREIGN KEY (location_id) REFERENCES location(location_id) ON DELETE CASCADE,
+    INDEX idx_postlocation_location (location_id, x_post_id)
+)"""
+
+
+def _rows(cursor):
+    """(first, second) column pairs from a tuple or dict cursor."""
+    return [tuple(row.values()) if isinstance(row, dict) else tuple(row) for row in cursor.fetchall()]
+
+
+def location_aliases(locations=SABAH_LOCATIONS):
+    """{alias: location name} as the writers store it: the canonical id, title-cased."""
+    aliases = {}
+    for canonical, names in locations.items():
+        for alias in [canonical] + names:
+            aliases.setdefault(' '.join(alias.lower().split()), canonical.title())
+    return aliases
+
+
+def sync_location_aliases(cursor, locations=SABAH_LOCATIONS):
+    """Create missing gazetteer locations and rewrite location_alias to match; returns the alias count."""
+    # Older databases were built from a schema.sql without these tables;
+    # every X ingest path links posts in postlocation
+    cursor.execute(CREATE_LOCATION_ALIAS)
+    cursor.execute(CREATE_POSTLOCATION)
+
+    aliases = location_aliases(locations)
+    cursor.execute("SELECT location_id, name FROM location ORDER BY location_id")
+    location_ids = {}
+    for location_id, name in _rows(cursor):
+        location_ids.setdefault(name, location_id)
+
+    missing = sorted(set(aliases.values()) - set(location_ids))
+    if missing:
+        print(f"Adding {len(missing)} gazetteer locations")
+        cursor.executemany("INSERT INTO location (name) VALUES (%s)", [(name,) for name in missing])
+        placeholders = ', '.join(['%s'] * len(missing))
+        cursor.execute(
+            f"SELECT location_id, name FROM location WHERE name IN ({placeholders}) ORDER BY location_id",
+            missing
+        )
+        for location_id, name in _rows(cursor):
+            location_ids.setdefault(name, location_id)
+
+    # Same lowest-id-per-name rule the writers use when they resolve a name
+    rows = sorted((alias, location_ids[name]) for alias, name in aliases.items())
+    cursor.executemany(
+        "INSERT INTO location_alias (alias, location_id) VALUES (%s, %s) "
+        "ON DUPLICATE KEY UPDATE location_id = VALUES(location_id)",
+        rows
+    )
+    placeholders = ', '.join(['%s'] * len(rows))
+    cursor.execute(f"DELETE FROM location_alias WHERE alias NOT IN ({placeholders})", [alias for alias, _ in rows])
+    return len(rows)
+
+
+def main():
+    connection = get_rds_connection()
+    try:
+        with connection.cursor() as cursor:
+            count = sync_location_aliases(cursor)
+        connection.commit()
+    finally:
+        connection.close()
+    print(f"Synced {count} location aliases")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+import json
+import base64
+from datetime import datetime, timezone
+
+
+def _unwrap_tweet(result):
+    """Return the Tweet object inside a tweet_results.result wrapper, or None."""
+    if not result:
+        return None
+    if result.get('__typename') == 'TweetWithVisibilityResults':
+        result = result.get('tweet') or {}
+    if result.get('__typename', 'Tweet') != 'Tweet' or 'legacy' not in result:
+        return None
+    return result
+
+
+def _screen_name(tweet):
+    user = ((tweet.get('core') or {}).get('user_results') or {}).get('result') or {}
+    # Newer payloads moved screen_name from legacy to core
+    return ((user.get('core') or {}).get('screen_name')
+            or (user.get('legacy') or {}).get('screen_name')
+            or '')
+
+
+def _iso_timestamp(created_at):
+    """Convert X's 'Wed Nov 27 03:12:45 +0000 2024' into the DOM's <time datetime> format."""
+    try:
+        dt = datetime.strptime(created_at, '%a %b %d %H:%M:%S %z %Y')
+        return dt.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+    except (TypeError, ValueError):
+        return ''
+
+
+def tweet_record_from_result(result):
+    """Build a tweet record (same fields as TweetParser output) from a timeline tweet result."""
+    tweet = _unwrap_tweet(result)
+    if tweet is None:
+        return None
+
+    legacy = tweet['legacy']
+    tweet_id = legacy.get('id_str') or tweet.get('rest_id', '')
+    username = _screen_name(tweet)
+
+    # Long posts carry their full text in note_tweet; legacy.full_text is truncated
+    note = (((tweet.get('note_tweet') or {}).get('note_tweet_results') or {}).get('result') or {})
+    content = note.get('text') or legacy.get('full_text', '')
+
+    views = (tweet.get('views') or {}).get('count')
+
+    return {
+        'content': ' '.join(content.split()),
+        'url': f"https://x.com/{username}/status/{tweet_id}" if username and tweet_id else '',
+        'username': username,
+        'date': _iso_timestamp(legacy.get('created_at')),
+        'retweets': int(legacy.get('retweet_count') or 0),
+        'likes': int(legacy.get('favorite_count') or 0),
+        'replies': int(legacy.get('reply_count') or 0),
+        'views': int(views) if views and str(views).isdigit() else 0,
+        'tweet_id': tweet_id
+    }
+
+
+def _iter_entries(payload):
+    timeline = (((payload.get('data') or {}).get('search_by_raw_query') or {})
+                .get('search_timeline') or {}).get('timeline') or {}
+    for instruction in timeline.get('instructions', []):
+        if instruction.get('type') == 'TimelineAddEntries':
+            yield from instruction.get('entries', [])
+        elif instruction.get('type') == 'TimelineReplaceEntry' and instruction.get('entry'):
+            yield instruction['entry']
+
+
+def parse_timeline_response(payload):
+    """Decode a SearchTimeline GraphQL response into tweet records, in timeline order."""
+    records = []
+    for entry in _iter_entries(payload):
+        content = entry.get('content') or {}
+        items = [content.get('itemContent')] if content.get('itemContent') else []
+        # Conversation modules nest several tweets in one entry
+        items += [(item.get('item') or {}).get('itemContent') for item in content.get('items', [])]
+
+        for item in items:
+            if not item or item.get('itemType') != 'TimelineTweet':
+                continue
+            if item.get('promotedMetadata'):
+                continue
+            record = tweet_record_from_result((item.get('tweet_results') or {}).get('result'))
+            if record:
+                records.append(record)
+    return records
+
+
+class NetworkEventLog:
+    """Drains Chrome's performance log and hands CDP Network events to listeners.
+
+    get_log('performance') empties the buffer, so every consumer of Network
+    events (TimelineCapture, the scraper's ResourcePolicy) subscribes here
+    instead of reading the log itself. The driver must be created with the
+    'goog:loggingPrefs' performance capability.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.listeners = []
+
+    def subscribe(self, listener):
+        """Register listener(method, params) for every Network.* event."""
+        self.listeners.append(listener)
+
+    def poll(self):
+        """Dispatch events logged since the last poll; returns how many were read."""
+        try:
+            entries = self.driver.get_log('performance')
+        except Exception as e:
+            print(f"Error reading performance log: {e}")
+            return 0
+
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, TypeError, ValueError):
+                continue
+
+            method = message.get('method') or ''
+            if not method.startswith('Network.'):
+                continue
+            params = message.get('params') or {}
+            for listener in self.listeners:
+                listener(method, params)
+        return len(entries)
+
+
+class TimelineCapture:
+    """Collects SearchTimeline API responses from Chrome's performance log.
+
+    The driver must be created with the 'goog:loggingPrefs' performance
+    capability (WebDriverManager.init_driver(capture_network=True)), which
+    also turns on CDP Network events.
+    """
+
+    URL_MARKER = 'SearchTimeline'
+
+    def __init__(self, driver, network_log=None):
+        self.driver = driver
+        self.network_log = network_log or NetworkEventLog(driver)
+        self.network_log.subscribe(self.on_network_event)
+        self.pending = {}
+        self.finished = []
+        self.responses = 0
+        self.errors = 0
+
+    def on_network_event(self, method, params):
+        """Track timeline requests until their bodies are ready to read."""
+        if method == 'Network.responseReceived':
+            url = (params.get('response') or {}).get('url', '')
+            if self.URL_MARKER in url and params.get('type') in ('XHR', 'Fetch'):
+                self.pending[params['requestId']] = url
+        elif method == 'Network.loadingFinished' and params.get('requestId') in self.pending:
+            self.finished.append(params['requestId'])
+        elif method == 'Network.loadingFailed':
+            self.pending.pop(params.get('requestId'), None)
+
+    def collect(self):
+        """Return tweet records from timeline responses that finished since the last call."""
+        self.network_log.poll()
+        finished, self.finished = self.finished, []
+
+        records = []
+        for request_id in finished:
+            self.pending.pop(request_id, None)
+            try:
+                body = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+                text = body.get('body', '')
+                if body.get('base64Encoded'):
+                    text = base64.b64decode(text).decode('utf-8')
+                records.extend(parse_timeline_response(json.loads(text)))
+                self.responses += 1
+            except Exception as e:
+                # Bodies can be evicted from Chrome's buffer; the DOM paths remain as fallback
+                self.errors += 1
+                print(f"Error reading timeline response: {e}")
+        return records
@@ -0,0 +1,120 @@
+import re
+import time
+import threading
+
+
+_STATUS_ID_RE = re.compile(r'/status/(\d+)')
+
+
+def extract_first_number(text):
+    """Extract first number from text, handling K/M/B suffixes."""
+    if not text:
+        return 0
+
+    clean_text = text.replace('\u202f', '').replace('\u00a0', ' ').replace('\xa0', ' ')
+    patterns = [
+        r'([\d,]+\.?\d*)[KkMmBb]?',
+        r'([\d,]+)',
+    ]
+
+    for pattern in patterns:
+        m = re.search(pattern, clean_text)
+        if m:
+            try:
+                num_str = m.group(1).replace(',', '')
+                num = float(num_str)
+
+                if 'K' in text.upper():
+                    num *= 1000
+                elif 'M' in text.upper():
+                    num *= 1000000
+                elif 'B' in text.upper():
+                    num *= 1000000000
+
+                return int(num)
+            except (ValueError, AttributeError):
+                continue
+
+    return 0
+
+
+def build_tweet_record(raw):
+    """Build a tweet record from raw extracted fields (live script or HTML snapshot)."""
+    data = {
+        'content': '',
+        'url': '',
+        'username': '',
+        'date': '',
+        'retweets': 0,
+        'likes': 0,
+        'replies': 0,
+        'views': 0
+    }
+
+    # Extract content
+    content_parts = raw.get('text_parts') or raw.get('text_blocks') or []
+    if content_parts:
+        joined = ' '.join(content_parts)
+        data['content'] = re.sub(r'\s+', ' ', joined).strip()
+
+    # Extract URL and username
+    href = raw.get('href') or ''
+    if '/status/' in href:
+        data['url'] = href
+        url_match = re.search(r'https?://(?:www\.)?x\.com/([^/]+)/status/(\d+)', href)
+        if url_match:
+            data['username'] = url_match.group(1)
+    else:
+        # Fallback URL construction
+        username = (raw.get('handle') or '').replace('@', '')
+        if username:
+            timestamp_id = str(int(time.time() * 1000))
+            data['url'] = f"https://x.com/{username}/status/{timestamp_id}"
+            data['username'] = username
+
+    # Extract date
+    data['date'] = raw.get('datetime') or ''
+
+    # Extract metrics
+    for metric, metric_texts in (raw.get('metrics') or {}).items():
+        for text in metric_texts:
+            if any(ch.isdigit() for ch in text):
+                data[metric] = extract_first_number(text)
+                break
+
+    return data
+
+
+def status_id(tweet):
+    """Return a tweet record's numeric status id, falling back to its URL."""
+    if tweet.get('tweet_id'):
+        return str(tweet['tweet_id'])
+    url = tweet.get('url') or ''
+    m = _STATUS_ID_RE.search(url)
+    return m.group(1) if m else url
+
+
+class StatusIdSet:
+    """Thread-safe set of claimed status ids, shared by concurrent scrape sessions."""
+
+    def __init__(self, ids=()):
+        self._ids = set(ids)
+        self._lock = threading.Lock()
+        self.duplicates = 0
+
+    def claim(self, key):
+        """Add key; returns False (and counts a duplicate) if it was already claimed."""
+        with self._lock:
+            if key in self._ids:
+                self.duplicates += 1
+                return False
+            self._ids.add(key)
+            return True
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._ids
+
+    def __len__(self):
+        with self._lock:
+            return len(self._ids)
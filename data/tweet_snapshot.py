@@ -0,0 +1,135 @@
+import os
+import sys
+import json
+import glob
+from urllib.parse import urljoin
+from concurrent.futures import ProcessPoolExecutor
+from lxml import etree, html as lxml_html
+from tweet_fields import build_tweet_record
+
+
+class SnapshotTweetParser:
+    """Parses tweets out of saved X page HTML (driver.page_source) without a browser."""
+
+    BASE_URL = 'https://x.com/'
+
+    # Compiled once; same selectors TweetParser uses against the live DOM
+    ARTICLES = etree.XPath('//article[@data-testid="tweet"] | //div[@data-testid="tweet"]')
+    ARTICLES_FALLBACK = etree.XPath('//article[@role="article"]')
+    TEXT_SPANS = etree.XPath('.//div[@data-testid="tweetText"]//span')
+    TEXT_BLOCKS = etree.XPath('.//div[@data-testid="tweetText"]')
+    TIME_LINK_HREF = etree.XPath('.//time/ancestor::a[contains(@href,"/status/")]/@href')
+    STATUS_HREFS = etree.XPath('.//a[contains(@href,"/status/")]/@href')
+    HANDLE = etree.XPath('.//div[@data-testid="User-Name"]//span[contains(@class,"css-1qaijid")]')
+    DATETIME = etree.XPath('string(.//time/@datetime)')
+    METRICS = {
+        'replies': etree.XPath('.//div[@data-testid="reply"]'),
+        'retweets': etree.XPath('.//div[@data-testid="retweet"]'),
+        'likes': etree.XPath('.//div[@data-testid="like"]'),
+        'views': etree.XPath('.//a[contains(@href, "/analytics")]')
+    }
+    SPANS = etree.XPath('.//span')
+
+    @staticmethod
+    def _texts(elements):
+        texts = []
+        for el in elements:
+            txt = el.text_content().strip()
+            if txt:
+                texts.append(txt)
+        return texts
+
+    @classmethod
+    def extract_articles(cls, page_html, base_url=None):
+        """Return raw field dicts (same shape as TweetParser.extract_articles) for a page."""
+        base_url = base_url or cls.BASE_URL
+        if isinstance(page_html, (str, bytes)):
+            tree = lxml_html.fromstring(page_html)
+        else:
+            tree = page_html
+
+        articles = cls.ARTICLES(tree) or cls.ARTICLES_FALLBACK(tree)
+
+        raws = []
+        for article in articles:
+            hrefs = cls.TIME_LINK_HREF(article) or cls.STATUS_HREFS(article)
+            # page_source keeps hrefs relative; the live DOM reports them absolute
+            absolute = [urljoin(base_url, href) for href in hrefs]
+            href = next((h for h in absolute if h.startswith('https://')), absolute[0] if absolute else '')
+
+            handle = cls.HANDLE(article)
+
+            metrics = {}
+            for metric, xpath in cls.METRICS.items():
+                containers = xpath(article)
+                metrics[metric] = cls._texts(cls.SPANS(containers[0])) if containers else []
+
+            raws.append({
+                'text_parts': cls._texts(cls.TEXT_SPANS(article)),
+                'text_blocks': cls._texts(cls.TEXT_BLOCKS(article)),
+                'href': href,
+                'handle': handle[0].text_content().strip() if handle else '',
+                'datetime': cls.DATETIME(article),
+                'metrics': metrics
+            })
+
+        return raws
+
+    @classmethod
+    def parse(cls, page_html, base_url=None):
+        """Parse every tweet on a page into tweet records."""
+        return [build_tweet_record(raw) for raw in cls.extract_articles(page_html, base_url)]
+
+    @classmethod
+    def parse_file(cls, path, base_url=None):
+        """Parse a saved HTML snapshot from disk."""
+        with open(path, 'rb') as f:
+            return cls.parse(f.read(), base_url)
+
+
+def parse_snapshot_files(paths, workers=1):
+    """Parse many snapshots, optionally across a process pool; returns records deduplicated by URL."""
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pages = list(pool.map(SnapshotTweetParser.parse_file, paths, chunksize=4))
+    else:
+        pages = [SnapshotTweetParser.parse_file(path) for path in paths]
+
+    tweets = []
+    seen_urls = set()
+    for page in pages:
+        for tweet in page:
+            if tweet['url'] and tweet['url'] in seen_urls:
+                continue
+            seen_urls.add(tweet['url'])
+            tweets.append(tweet)
+    return tweets
+
+
+def main():
+    """Re-parse archived snapshots: python tweet_snapshot.py <files or dirs> [--workers N]"""
+    args = sys.argv[1:]
+    workers = 1
+    if '--workers' in args:
+        i = args.index('--workers')
+        workers = int(args[i + 1])
+        del args[i:i + 2]
+
+    paths = []
+    for arg in args:
+        if os.path.isdir(arg):
+            paths.extend(sorted(glob.glob(os.path.join(arg, '*.html'))))
+        else:
+            paths.append(arg)
+
+    if not paths:
+        print("Usage: python tweet_snapshot.py <snapshot.html | dir> ... [--workers N]", file=sys.stderr)
+        sys.exit(1)
+
+    tweets = parse_snapshot_files(paths, workers)
+    print(f"Parsed {len(tweets)} tweets from {len(paths)} snapshots", file=sys.stderr)
+    json.dump(tweets, sys.stdout, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
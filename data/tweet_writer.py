@@ -0,0 +1,276 @@
+import time
+import queue
+import logging
+import threading
+from rds_connector import get_rds_connection
+from gazetteer import SABAH_GAZETTEER
+
+logger = logging.getLogger(__name__)
+
+X_SOURCE_ID = 1
+
+INSERT_TWEETS_PREFIX = """
+INSERT IGNORE INTO x_post
+(source_id, location_id, original_id, content, post_time, url, likes_count, retweets_count, replies_count, views_count)
+VALUES """
+INSERT_TWEETS_ROW = "(%s, %s, %s, %s, NOW(), %s, %s, %s, %s, %s)"
+
+def tweet_original_id(tweet):
+    return tweet.get('url', '').split('/')[-1] if tweet.get('url') else str(hash(tweet.get('content', '')))
+
+
+def tweet_location_names(tweet):
+    """Names of every gazetteer location mentioned in the tweet, as stored in the location table."""
+    return [location_id.title() for location_id in SABAH_GAZETTEER.mentioned_ids(tweet.get('content') or '')]
+
+
+class LocationIds:
+    """location name -> location_id for one writer, loaded once and extended as names are resolved.
+
+    location.name is not unique, so names missing from the map are looked
+    up again with a locking read and only inserted if still absent; other
+    writers creating the same name then wait for this transaction instead
+    of adding a duplicate row. Call reset() after a rollback, which undoes
+    the locations created in it.
+    """
+
+    def __init__(self):
+        self.ids = None
+
+    def reset(self):
+        self.ids = None
+
+    def resolve(self, cursor, location_names):
+        """Return {name: location_id}, creating missing locations."""
+        if self.ids is None:
+            cursor.execute("SELECT location_id, name FROM location ORDER BY location_id")
+            self.ids = {}
+            for row in cursor.fetchall():
+                self.ids.setdefault(row['name'], row['location_id'])
+
+        missing = sorted({name for name in location_names if name} - set(self.ids))
+        if missing:
+            # Another writer may have created them since the map was loaded
+            self._lookup(cursor, missing)
+            missing = [name for name in missing if name not in self.ids]
+        if missing:
+            cursor.executemany(
+                "INSERT INTO location (name) SELECT %s FROM DUAL "
+                "WHERE NOT EXISTS (SELECT 1 FROM location WHERE name = %s)",
+                [(name, name) for name in missing]
+            )
+            self._lookup(cursor, missing)
+
+        return {name: self.ids.get(name) for name in location_names if name}
+
+    def _lookup(self, cursor, names):
+        # A locking read sees rows committed after this transaction's
+        # snapshot, and holds the name range until commit
+        placeholders = ', '.join(['%s'] * len(names))
+        cursor.execute(
+            f"SELECT location_id, name FROM location WHERE name IN ({placeholders}) "
+            "ORDER BY location_id LOCK IN SHARE MODE",
+            names
+        )
+        for row in cursor.fetchall():
+            self.ids.setdefault(row['name'], row['location_id'])
+
+
+def tweet_row(tweet, location_id=None, source_id=X_SOURCE_ID):
+    """Column values for one scraped tweet, in INSERT_TWEETS_ROW order."""
+    return (
+        source_id,
+        location_id,
+        tweet_original_id(tweet),
+        tweet.get('content', ''),
+        tweet.get('url', ''),
+        tweet.get('likes', 0),
+        tweet.get('retweets', 0),
+        tweet.get('replies', 0),
+        tweet.get('views', 0)
+    )
+
+
+def insert_tweet_batch(cursor, tweets, locations=None):
+    """Insert tweets with one multi-row INSERT IGNORE; returns the number of new rows.
+
+    locations, a LocationIds, carries resolved location ids across batches.
+    """
+    if not tweets:
+        return 0
+    if locations is None:
+        locations = LocationIds()
+    # Built by hand rather than with executemany: pymysql only folds
+    # statements whose VALUES are all placeholders, and post_time is NOW()
+    query = INSERT_TWEETS_PREFIX + ', '.join([INSERT_TWEETS_ROW] * len(tweets))
+    location_names = [tweet_location_names(tweet) for tweet in tweets]
+    location_ids = locations.resolve(cursor, [name for names in location_names for name in names])
+
+    params = []
+    post_locations = {}
+    for tweet, names in zip(tweets, location_names):
+        ids = [location_ids[name] for name in names if location_ids.get(name)]
+        row = tweet_row(tweet, ids[0] if ids else None)
+        params.extend(row)
+        if ids:
+            post_locations[row[2]] = ids
+
+    cursor.execute(query, params)
+    inserted = cursor.rowcount
+    link_post_locations(cursor, post_locations)
+    return inserted
+
+
+def link_post_locations(cursor, post_locations):
+    """Link posts, by original_id, to every location they mention."""
+    if not post_locations:
+        return
+    placeholders = ', '.join(['%s'] * len(post_locations))
+    cursor.execute(
+        f"SELECT x_post_id, original_id FROM x_post WHERE original_id IN ({placeholders})",
+        list(post_locations)
+    )
+    rows = [(row['x_post_id'], location_id)
+            for row in cursor.fetchall()
+            for location_id in post_locations.get(row['original_id'], ())]
+    if rows:
+        cursor.executemany("INSERT IGNORE INTO postlocation (x_post_id, location_id) VALUES (%s, %s)", rows)
+
+
+def ensure_x_source(cursor):
+    cursor.execute("INSERT IGNORE INTO source (name, type) VALUES ('X', 'SOCIAL_MEDIA')")
+
+
+class TweetWriter:
+    """Background thread that stores scraped tweets while scraping continues.
+
+    put() blocks once max_queued tweets are waiting, so a slow database
+    throttles the scraper instead of growing memory. Batches are flushed
+    when batch_size tweets are queued or flush_interval seconds after the
+    first one arrived, on one connection that is reopened after a failure.
+    """
+
+    _CLOSE = object()
+
+    def __init__(self, batch_size=50, flush_interval=2.0, max_queued=200, connect=get_rds_connection):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.connect = connect
+        self.queue = queue.Queue(maxsize=max_queued)
+        self.connection = None
+        self.locations = LocationIds()
+        self.thread = None
+
+        self.received = 0
+        self.saved = 0
+        self.failed = 0
+        self.batches = 0
+        self.write_seconds = 0.0
+        self.newest_id = None
+        self.errors = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name='tweet-writer', daemon=True)
+        self.thread.start()
+        return self
+
+    def put(self, tweet):
+        """Queue one tweet for writing; waits while the queue is full."""
+        self.received += 1
+        self.queue.put(tweet)
+
+    def close(self):
+        """Flush everything still queued and stop the writer thread."""
+        if self.thread is None:
+            return
+        self.queue.put(self._CLOSE)
+        self.thread.join()
+        self.thread = None
+
+    def _run(self):
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is not None and item is not self._CLOSE:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            if batch and (item is None or item is self._CLOSE or len(batch) >= self.batch_size):
+                self._flush(batch)
+                batch = []
+                deadline = None
+
+            if item is self._CLOSE:
+                break
+
+        if self.connection:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+            self.connection = None
+
+    def _flush(self, batch):
+        start = time.perf_counter()
+        # One retry on a fresh connection covers a dropped or timed-out link
+        for attempt in range(2):
+            try:
+                if self.connection is None:
+                    self.connection = self.connect()
+                    with self.connection.cursor() as cursor:
+                        ensure_x_source(cursor)
+                with self.connection.cursor() as cursor:
+                    inserted = insert_tweet_batch(cursor, batch, self.locations)
+                self.connection.commit()
+                # Counted only once committed, so a retried batch is not counted twice
+                self.saved += inserted
+                self.batches += 1
+                self._advance_newest(batch)
+                break
+            except Exception as e:
+                logger.error(f"Tweet batch insert failed (attempt {attempt + 1}): {e}")
+                self.locations.reset()
+                if self.connection is not None:
+                    # Closing a pooled connection rolls it back and hands it
+                    # back (or drops it if the socket is gone)
+                    try:
+                        self.connection.rollback()
+                    except Exception:
+                        pass
+                    try:
+                        self.connection.close()
+                    except Exception:
+                        pass
+                    self.connection = None
+                if attempt:
+                    self.failed += len(batch)
+                    self.errors.append(str(e))
+        self.write_seconds += time.perf_counter() - start
+
+    def _advance_newest(self, batch):
+        for tweet in batch:
+            original_id = tweet_original_id(tweet)
+            if original_id.isdigit() and (self.newest_id is None or int(original_id) > int(self.newest_id)):
+                self.newest_id = original_id
+
+    def stats(self):
+        return {
+            'received': self.received,
+            'saved': self.saved,
+            'failed': self.failed,
+            'batches': self.batches,
+            'write_seconds': round(self.write_seconds, 2)
+        }
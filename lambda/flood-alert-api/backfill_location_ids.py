@@ -0,0 +1,79 @@
+# lambda/backfill_location_ids.py
+"""One-off backfill: link x_post rows stored before ingest resolved their locations.
+
+Runs the API's location resolver over every post without postlocation
+rows, in primary-key order, committing after each batch so it can be
+stopped and rerun. Each post is linked to every location it mentions and
+gets the first as its location_id if it has none. Once it has run, unset
+LOCATION_FALLBACK_MAX_ID on the Lambda. Run data/sync_locations.py first
+(it creates postlocation and the gazetteer aliases posts are matched on),
+then from lambda/flood-alert-api/ with the RDS_* variables set:
+
+    python backfill_location_ids.py [batch_size]
+"""
+import sys
+import logging
+from rds_connector import get_rds_connection
+from location_resolver import load_gazetteer, resolve_location_ids
+from flood_alert_api import link_post_locations
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+def backfill_location_ids(connection, batch_size=BATCH_SIZE):
+    """Link posts to the locations their content names; returns (scanned, linked)"""
+    scanned = 0
+    linked = 0
+    last_id = 0
+
+    with connection.cursor() as cursor:
+        load_gazetteer(cursor, force=True)
+
+        while True:
+            cursor.execute(
+                "SELECT x_post_id, content, location_id FROM x_post xp "
+                "WHERE x_post_id > %s "
+                "AND NOT EXISTS (SELECT 1 FROM postlocation pl WHERE pl.x_post_id = xp.x_post_id) "
+                "ORDER BY x_post_id LIMIT %s",
+                (last_id, batch_size)
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1]['x_post_id']
+            scanned += len(rows)
+
+            post_locations = []
+            primary = []
+            for row in rows:
+                location_ids = resolve_location_ids(row['content'])
+                if not location_ids:
+                    continue
+                post_locations.append((row['x_post_id'], location_ids))
+                if row['location_id'] is None:
+                    primary.append((location_ids[0], row['x_post_id']))
+
+            if primary:
+                cursor.executemany(
+                    "UPDATE x_post SET location_id = %s WHERE x_post_id = %s AND location_id IS NULL",
+                    primary
+                )
+            link_post_locations(cursor, post_locations)
+            linked += len(post_locations)
+            connection.commit()
+            logger.info(f"Linked {linked} of {scanned} posts (through x_post_id {last_id})")
+
+    return scanned, linked
+
+def main():
+    batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else BATCH_SIZE
+    connection = get_rds_connection()
+    try:
+        scanned, linked = backfill_location_ids(connection, batch_size)
+    finally:
+        connection.close()
+    print(f"Linked {linked} of {scanned} posts without locations")
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,15 @@
 # lambda/flood_alert_api.py
 import json
 import os
-from rds_connector import get_rds_connection
+import base64
+from datetime import datetime
+from rds_connector import get_warm_connection, release_connection
+from location_resolver import load_gazetteer, lookup_location_ids, resolve_location_ids, resolve_keyword_ids
+
+# Highest x_post_id stored before ingest linked posts to locations. Posts up
+# to it are also matched on their text until backfill_location_ids.py has
+# run; 0 (the default) turns the fallback off
+LOCATION_FALLBACK_MAX_ID = int(os.environ.get('LOCATION_FALLBACK_MAX_ID', '0'))
 
 def lambda_handler(event, context):
     """Main Lambda handler with API key authentication"""
@@ -57,7 +65,16 @@ def get_tweets_handler(event):
         offset = int(params.get('offset', 0))
         location = params.get('location', '')
 
-        tweets = get_tweets_from_rds(limit, offset, location)
+        # Passing 'cursor' (empty for the first page) switches to keyset
+        # pagination; the response then carries 'next_cursor'
+        if 'cursor' in params:
+            tweets = get_tweets_page_from_rds(limit, params.get('cursor') or '', location)
+        else:
+            tweets = get_tweets_from_rds(limit, offset, location)
+            # Unfiltered offset pages keep the original bare-list response;
+            # location-filtered ones report which match strategy was used
+            if not location:
+                tweets = tweets['tweets']
 
         return {
             'statusCode': 200,
@@ -68,6 +85,13 @@ def get_tweets_handler(event):
             'body': json.dumps(tweets)
         }
 
+    except ValueError as e:
+        print(f"Bad request in get_tweets_handler: {str(e)}")
+        return {
+            'statusCode': 400,
+            'headers': {'Content-Type': 'application/json'},
+            'body': json.dumps({'error': str(e)})
+        }
     except Exception as e:
         print(f"Error in get_tweets_handler: {str(e)}")
         return {
@@ -97,10 +121,25 @@ def post_tweets_handler(event):
                 'body': json.dumps({'error': 'No tweets provided'})
             }
 
-        print(f"Processing {len(tweets)} tweets")
+        # 'bulk' (default) sends the whole batch through executemany,
+        # 'row' keeps the original one-INSERT-per-tweet path
+        mode = body.get('mode', 'bulk')
+        if mode not in ('bulk', 'row'):
+            return {
+                'statusCode': 400,
+                'headers': {'Content-Type': 'application/json'},
+                'body': json.dumps({'error': f"Unknown mode: {mode} (expected 'bulk' or 'row')"})
+            }
+
+        print(f"Processing {len(tweets)} tweets (mode: {mode})")
 
         # Save to database
-        saved_count = save_tweets_to_rds(tweets)
+        if mode == 'row':
+            saved_count = save_tweets_to_rds(tweets)
+            result = {'saved_count': saved_count}
+        else:
+            result = save_tweets_to_rds_bulk(tweets)
+            saved_count = result['saved_count']
 
         return {
             'statusCode': 200,
@@ -110,7 +149,8 @@ def post_tweets_handler(event):
             },
             'body': json.dumps({
                 'message': f'Successfully saved {saved_count} tweets',
-                'saved_count': saved_count
+                'mode': mode,
+                **result
             })
         }
 
@@ -129,50 +169,171 @@ def post_tweets_handler(event):
             'body': json.dumps({'error': str(e)})
         }
 
+TWEET_COLUMNS = """
+            SELECT x_post_id, original_id, content, post_time, url,
+                   likes_count, retweets_count, replies_count, views_count
+            FROM x_post
+            """
+
+def format_tweet_row(row):
+    """Convert an x_post row into the API's tweet shape"""
+    return {
+        'id': row['x_post_id'],
+        'original_id': row['original_id'],
+        'content': row['content'],
+        'post_time': row['post_time'].isoformat() if row['post_time'] else None,
+        'url': row['url'],
+        'likes': row['likes_count'],
+        'retweets': row['retweets_count'],
+        'replies': row['replies_count'],
+        'views': row['views_count']
+    }
+
+def encode_page_cursor(post_time, x_post_id):
+    """Build the opaque continuation token for a (post_time, x_post_id) position"""
+    raw = f"{post_time.isoformat()}|{x_post_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_page_cursor(token):
+    """Parse a continuation token back into (post_time, x_post_id)"""
+    try:
+        raw = base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8')
+        post_time, x_post_id = raw.split('|')
+        return datetime.fromisoformat(post_time), int(x_post_id)
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {token}") from e
+
+def build_location_filter(cursor, location):
+    """Resolve a location name to an SQL condition and report the matching strategy"""
+    load_gazetteer(cursor)
+    location_ids = lookup_location_ids(location)
+
+    if location_ids:
+        # Resolved at ingest time: every location a post mentions is linked
+        # in postlocation, probed on its primary key or idx_postlocation_location
+        placeholders = ', '.join(['%s'] * len(location_ids))
+        condition = f"x_post_id IN (SELECT x_post_id FROM postlocation WHERE location_id IN ({placeholders}))"
+        params = list(location_ids)
+        if LOCATION_FALLBACK_MAX_ID:
+            # Bounded to the primary-key range stored before the change, so
+            # the text scan does not grow with posts that name no location
+            condition = f"({condition} OR (x_post_id <= %s AND LOWER(content) LIKE %s))"
+            params.extend([LOCATION_FALLBACK_MAX_ID, f'%{location.lower()}%'])
+        return {
+            'condition': condition,
+            'params': params,
+            'match_strategy': 'location_id',
+            'location_ids': location_ids
+        }
+
+    # Unknown place name: fall back to scanning the post text
+    return {
+        'condition': "LOWER(content) LIKE %s",
+        'params': [f'%{location.lower()}%'],
+        'match_strategy': 'content_like',
+        'location_ids': []
+    }
+
 def get_tweets_from_rds(limit=50, offset=0, location=''):
     """Retrieve tweets from RDS database"""
-    conn = get_rds_connection()
+    # Reused across warm invocations; released (not closed) when done
+    conn = get_warm_connection()
+    failed = False
 
     try:
         with conn.cursor() as cursor:
-            base_query = """
-            SELECT x_post_id, original_id, content, post_time, url,
-                   likes_count, retweets_count, replies_count, views_count
-            FROM x_post
-            """
+            base_query = TWEET_COLUMNS
+            result = {'match_strategy': 'all'}
 
             if location:
-                base_query += " WHERE LOWER(content) LIKE %s"
+                location_filter = build_location_filter(cursor, location)
+                base_query += " WHERE " + location_filter['condition']
                 cursor.execute(base_query + " ORDER BY post_time DESC LIMIT %s OFFSET %s",
-                             (f'%{location.lower()}%', limit, offset))
+                             location_filter['params'] + [limit, offset])
+                result.update({
+                    'location': location,
+                    'match_strategy': location_filter['match_strategy'],
+                    'location_ids': location_filter['location_ids']
+                })
             else:
                 cursor.execute(base_query + " ORDER BY post_time DESC LIMIT %s OFFSET %s",
                              (limit, offset))
 
             rows = cursor.fetchall()
 
-            tweets = []
-            for row in rows:
-                tweets.append({
-                    'id': row[0],
-                    'original_id': row[1],
-                    'content': row[2],
-                    'post_time': row[3].isoformat() if row[3] else None,
-                    'url': row[4],
-                    'likes': row[5],
-                    'retweets': row[6],
-                    'replies': row[7],
-                    'views': row[8]
+            result['tweets'] = [format_tweet_row(row) for row in rows]
+            return result
+
+    except Exception:
+        failed = True
+        raise
+    finally:
+        release_connection(conn, failed)
+
+def get_tweets_page_from_rds(limit=50, cursor_token='', location=''):
+    """Retrieve one keyset page of tweets, newest first, plus the token for the next page"""
+    conn = get_warm_connection()
+    failed = False
+
+    try:
+        with conn.cursor() as cursor:
+            conditions = []
+            params = []
+            result = {'match_strategy': 'all'}
+
+            # Seek past the last row of the previous page instead of counting
+            # rows with OFFSET; post_time is the leading column of
+            # idx_x_post_post_time and InnoDB appends the primary key, so
+            # this is a range scan on that index however deep the page is
+            if cursor_token:
+                post_time, x_post_id = decode_page_cursor(cursor_token)
+                conditions.append("(post_time < %s OR (post_time = %s AND x_post_id < %s))")
+                params.extend([post_time, post_time, x_post_id])
+
+            if location:
+                location_filter = build_location_filter(cursor, location)
+                conditions.append(location_filter['condition'])
+                params.extend(location_filter['params'])
+                result.update({
+                    'location': location,
+                    'match_strategy': location_filter['match_strategy'],
+                    'location_ids': location_filter['location_ids']
                 })
 
-            return tweets
+            query = TWEET_COLUMNS
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
+            query += " ORDER BY post_time DESC, x_post_id DESC LIMIT %s"
+            params.append(limit)
+
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+
+            next_cursor = None
+            if len(rows) == limit and rows:
+                last = rows[-1]
+                next_cursor = encode_page_cursor(last['post_time'], last['x_post_id'])
 
+            result.update({
+                'tweets': [format_tweet_row(row) for row in rows],
+                'next_cursor': next_cursor
+            })
+            return result
+
+    except Exception:
+        failed = True
+        raise
     finally:
-        conn.close()
+        release_connection(conn, failed)
+
+def get_tweet_original_id(tweet):
+    """Derive the x_post.original_id for a tweet from its URL or content hash"""
+    return tweet.get('url', '').split('/')[-1] if tweet.get('url') else str(hash(tweet.get('content', '')))
 
 def save_tweets_to_rds(tweets):
     """Save tweets to RDS database"""
-    conn = get_rds_connection()
+    conn = get_warm_connection()
+    failed = False
     saved = 0
 
     try:
@@ -183,17 +344,24 @@ def save_tweets_to_rds(tweets):
             source_result = cursor.fetchone()
             source_id = source_result['source_id'] if source_result else 1
 
+            # Locations and keywords are resolved once here so reads can
+            # filter on postlocation instead of scanning content
+            load_gazetteer(cursor)
+
             for tweet in tweets:
                 try:
                     # Generate tweet ID from URL or content hash
-                    tweet_id = tweet.get('url', '').split('/')[-1] if tweet.get('url') else str(hash(tweet.get('content', '')))
+                    tweet_id = get_tweet_original_id(tweet)
+                    content = tweet.get('content', '')
+                    location_ids = resolve_location_ids(content)
 
                     cursor.execute("""
                         INSERT IGNORE INTO x_post
-                        (source_id, original_id, content, post_time, url, likes_count, retweets_count, replies_count, views_count)
-                        VALUES (%s, %s, %s, NOW(), %s, %s, %s, %s, %s)
+                        (source_id, location_id, original_id, content, post_time, url, likes_count, retweets_count, replies_count, views_count)
+                        VALUES (%s, %s, %s, %s, NOW(), %s, %s, %s, %s, %s)
                     """, (
                         source_id,
+                        location_ids[0] if location_ids else None,
                         tweet_id,
                         tweet.get('content', ''),
                         tweet.get('url', ''),
@@ -205,6 +373,9 @@ def save_tweets_to_rds(tweets):
 
                     if cursor.rowcount > 0:
                         saved += 1
+                        x_post_id = cursor.lastrowid
+                        link_post_keywords(cursor, [(x_post_id, resolve_keyword_ids(content))])
+                        link_post_locations(cursor, [(x_post_id, location_ids)])
                         print(f"Saved tweet: {tweet.get('content', '')[:50]}...")
 
                 except Exception as e:
@@ -216,9 +387,158 @@ def save_tweets_to_rds(tweets):
 
     except Exception as e:
         print(f"Database error: {str(e)}")
-        conn.rollback()
+        failed = True
         raise e
     finally:
-        conn.close()
+        release_connection(conn, failed)
+
+    return saved
+
+def save_tweets_to_rds_bulk(tweets):
+    """Save tweets to RDS in one multi-row INSERT and report saved/duplicate ids"""
+    # Collapse duplicates inside the batch first; the first occurrence wins
+    # just like it would with sequential INSERT IGNOREs
+    batch = {}
+    duplicate_ids = []
+    for tweet in tweets:
+        tweet_id = get_tweet_original_id(tweet)
+        if tweet_id in batch:
+            duplicate_ids.append(tweet_id)
+        else:
+            batch[tweet_id] = tweet
+
+    if not batch:
+        return {'saved_count': 0, 'duplicate_count': len(duplicate_ids),
+                'saved_ids': [], 'duplicate_ids': duplicate_ids}
 
-    return saved
\ No newline at end of file
+    conn = get_warm_connection()
+    failed = False
+
+    try:
+        with conn.cursor() as cursor:
+            # Ensure source exists
+            cursor.execute("INSERT IGNORE INTO source (name, type) VALUES ('X', 'SOCIAL_MEDIA')")
+            cursor.execute("SELECT source_id FROM source WHERE name = 'X'")
+            source_result = cursor.fetchone()
+            source_id = source_result['source_id'] if source_result else 1
+
+            # One lookup for the ids that are already stored
+            tweet_ids = list(batch)
+            placeholders = ', '.join(['%s'] * len(tweet_ids))
+            cursor.execute(
+                f"SELECT original_id FROM x_post WHERE original_id IN ({placeholders})",
+                tweet_ids
+            )
+            existing = {row['original_id'] for row in cursor.fetchall()}
+
+            # Locations and keywords are resolved once here so reads can
+            # filter on postlocation instead of scanning content
+            load_gazetteer(cursor)
+
+            # post_time is bound as a parameter (not NOW()) so pymysql can fold
+            # the statement into multi-row VALUES lists up to max_stmt_length
+            post_time = datetime.now()
+            post_locations = {
+                tweet_id: resolve_location_ids(tweet.get('content', ''))
+                for tweet_id, tweet in batch.items()
+                if tweet_id not in existing
+            }
+            rows = [
+                (
+                    source_id,
+                    post_locations[tweet_id][0] if post_locations[tweet_id] else None,
+                    tweet_id,
+                    tweet.get('content', ''),
+                    post_time,
+                    tweet.get('url', ''),
+                    tweet.get('likes', 0),
+                    tweet.get('retweets', 0),
+                    tweet.get('replies', 0),
+                    tweet.get('views', 0)
+                )
+                for tweet_id, tweet in batch.items()
+                if tweet_id not in existing
+            ]
+
+            candidate_ids = [row[2] for row in rows]
+
+            inserted = 0
+            stored = []
+            if rows:
+                inserted = cursor.executemany("""
+                    INSERT IGNORE INTO x_post
+                    (source_id, location_id, original_id, content, post_time, url, likes_count, retweets_count, replies_count, views_count)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """, rows)
+
+                # Under REPEATABLE READ this reads the snapshot taken before the
+                # lookup plus our own inserts: an id a concurrent writer stored
+                # in between (and INSERT IGNORE skipped) is not returned, so
+                # these are exactly the rows this request saved
+                placeholders = ', '.join(['%s'] * len(candidate_ids))
+                cursor.execute(
+                    f"SELECT x_post_id, original_id FROM x_post WHERE original_id IN ({placeholders})",
+                    candidate_ids
+                )
+                stored = cursor.fetchall()
+
+            # The junctions need x_post_id, taken from the same read
+            link_post_keywords(cursor, [
+                (row['x_post_id'], resolve_keyword_ids(batch[row['original_id']].get('content', '')))
+                for row in stored
+            ])
+            link_post_locations(cursor, [
+                (row['x_post_id'], post_locations[row['original_id']]) for row in stored
+            ])
+
+            conn.commit()
+
+    except Exception as e:
+        print(f"Database error: {str(e)}")
+        failed = True
+        raise e
+    finally:
+        release_connection(conn, failed)
+
+    stored_ids = {row['original_id'] for row in stored}
+    saved_ids = [tweet_id for tweet_id in candidate_ids if tweet_id in stored_ids]
+    # Already stored before the lookup, or by a concurrent writer after it
+    duplicate_ids.extend(tweet_id for tweet_id in tweet_ids if tweet_id not in stored_ids)
+
+    if inserted != len(saved_ids):
+        print(f"Warning: server reported {inserted} inserts for {len(saved_ids)} saved ids")
+
+    print(f"Bulk insert committed. Saved: {len(saved_ids)}, duplicates: {len(duplicate_ids)}")
+
+    return {
+        'saved_count': len(saved_ids),
+        'duplicate_count': len(duplicate_ids),
+        'saved_ids': saved_ids,
+        'duplicate_ids': duplicate_ids
+    }
+
+def link_post_locations(cursor, post_locations):
+    """Insert postlocation rows for (x_post_id, location_ids) pairs in one statement"""
+    rows = [
+        (x_post_id, location_id)
+        for x_post_id, location_ids in post_locations
+        for location_id in location_ids
+    ]
+    if rows:
+        cursor.executemany(
+            "INSERT IGNORE INTO postlocation (x_post_id, location_id) VALUES (%s, %s)",
+            rows
+        )
+
+def link_post_keywords(cursor, post_keywords):
+    """Insert postkeyword rows for (x_post_id, keyword_ids) pairs in one statement"""
+    rows = [
+        (x_post_id, keyword_id)
+        for x_post_id, keyword_ids in post_keywords
+        for keyword_id in keyword_ids
+    ]
+    if rows:
+        cursor.executemany(
+            "INSERT IGNORE INTO postkeyword (x_post_id, keyword_id) VALUES (%s, %s)",
+            rows
+        )
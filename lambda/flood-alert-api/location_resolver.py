@@ -0,0 +1,108 @@
+import os
+import re
+import time
+import logging
+import pymysql
+
+logger = logging.getLogger(__name__)
+
+# Seconds before the cached location/keyword tables are reloaded
+GAZETTEER_TTL = float(os.environ.get('GAZETTEER_TTL', '300'))
+
+# Module-level cache survives across warm Lambda invocations
+_gazetteer = {
+    'loaded_at': None,
+    'location_ids': {},
+    'match_ids': {},
+    'location_pattern': None,
+    'keyword_ids': {},
+    'keyword_pattern': None
+}
+
+def build_name_pattern(names):
+    """Compile one word-bounded alternation (optionally #-prefixed) for a set of names"""
+    if not names:
+        return None
+    # Longest first so 'kota kinabalu' wins over 'kota'
+    # Any run of whitespace between words, as data/gazetteer.py matches it
+    escaped = [r'\s+'.join(map(re.escape, name.split())) for name in sorted(names, key=len, reverse=True)]
+    return re.compile(r'(?<!\w)#?(%s)(?!\w)' % '|'.join(escaped), re.IGNORECASE)
+
+def normalize_name(name):
+    return ' '.join(name.lower().split())
+
+def load_location_aliases(cursor):
+    """Return {alias: location_id} from location_alias, or None if it has not been synced"""
+    try:
+        cursor.execute("SELECT alias, location_id FROM location_alias")
+    except pymysql.err.ProgrammingError as e:
+        # Table missing: the database predates location_alias
+        logger.warning(f"location_alias unavailable, matching location names only: {e}")
+        return None
+    aliases = {normalize_name(row['alias']): row['location_id'] for row in cursor.fetchall()}
+    if not aliases:
+        logger.warning("location_alias is empty (run data/sync_locations.py); matching location names only")
+        return None
+    return aliases
+
+def load_gazetteer(cursor, force=False):
+    """Load location and keyword names from RDS, at most once per GAZETTEER_TTL"""
+    loaded_at = _gazetteer['loaded_at']
+    if not force and loaded_at is not None and time.monotonic() - loaded_at < GAZETTEER_TTL:
+        return _gazetteer
+
+    location_ids = {}
+    cursor.execute("SELECT location_id, name FROM location ORDER BY location_id")
+    for row in cursor.fetchall():
+        location_ids.setdefault(normalize_name(row['name']), []).append(row['location_id'])
+
+    # Posts are matched on the gazetteer aliases data/sync_locations.py
+    # mirrors, the same names and ids the data/ writers resolve to; the
+    # location names only cover databases that have not been synced
+    aliases = load_location_aliases(cursor)
+    if aliases is None:
+        match_ids = {name: ids[0] for name, ids in location_ids.items()}
+    else:
+        match_ids = aliases
+        for alias, location_id in aliases.items():
+            ids = location_ids.setdefault(alias, [])
+            if location_id not in ids:
+                ids.append(location_id)
+
+    keyword_ids = {}
+    cursor.execute("SELECT keyword_id, keyword_text FROM keyword")
+    for row in cursor.fetchall():
+        keyword_ids[row['keyword_text'].strip().lower()] = row['keyword_id']
+
+    _gazetteer.update({
+        'loaded_at': time.monotonic(),
+        'location_ids': location_ids,
+        'match_ids': match_ids,
+        'location_pattern': build_name_pattern(match_ids),
+        'keyword_ids': keyword_ids,
+        'keyword_pattern': build_name_pattern(keyword_ids)
+    })
+    logger.info(f"Loaded {len(location_ids)} location names ({len(match_ids)} matched) and {len(keyword_ids)} keywords")
+    return _gazetteer
+
+def resolve_location_ids(content):
+    """Return the distinct location_ids of every known location mentioned in content, in order"""
+    pattern = _gazetteer['location_pattern']
+    if not content or pattern is None:
+        return []
+    match_ids = _gazetteer['match_ids']
+    return list(dict.fromkeys(match_ids[normalize_name(match.group(1))] for match in pattern.finditer(content)))
+
+def resolve_keyword_ids(content):
+    """Return the keyword_ids of every known keyword mentioned in content"""
+    pattern = _gazetteer['keyword_pattern']
+    if not content or pattern is None:
+        return set()
+    keyword_ids = _gazetteer['keyword_ids']
+    return {keyword_ids[match.group(1).lower()] for match in pattern.finditer(content)}
+
+def lookup_location_ids(name):
+    """Return every location_id stored under a location name (case-insensitive)"""
+    if not name:
+        return []
+    return _gazetteer['location_ids'].get(normalize_name(name), [])
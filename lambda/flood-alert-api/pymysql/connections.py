@@ -2,7 +2,9 @@
 # http://dev.mysql.com/doc/internals/en/client-server-protocol.html
 # Error codes:
 # https://dev.mysql.com/doc/refman/5.5/en/error-handling.html
+import datetime
 import errno
+import functools
 import os
 import socket
 import struct
@@ -24,6 +26,9 @@ from .protocol import (
     OKPacketWrapper,
     EOFPacketWrapper,
     LoadLocalPacketWrapper,
+    NULL_COLUMN,
+    UNSIGNED_SHORT_COLUMN,
+    UNSIGNED_INT24_COLUMN,
 )
 from . import err, VERSION_STRING
 
@@ -66,6 +71,9 @@ DEFAULT_CHARSET = "utf8mb4"
 
 MAX_PACKET_LEN = 2**24 - 1
 
+# Initial size of the receive buffer row packets are read into
+RECV_BUFFER_SIZE = 16 * 1024
+
 
 def _pack_int24(n):
     return struct.pack("<I", n)[:3]
@@ -165,6 +173,7 @@ class Connection:
 
     _sock = None
     _rfile = None
+    _recv_buffer = None
     _auth_plugin_name = ""
     _closed = False
     _secure = False
@@ -449,6 +458,7 @@ class Connection:
                 pass
         self._sock = None
         self._rfile = None
+        self._recv_buffer = None
 
     __del__ = _force_close
 
@@ -739,14 +749,20 @@ class Connection:
         self._write_bytes(data)
         self._next_seq_id = (self._next_seq_id + 1) % 256
 
-    def _read_packet(self, packet_type=MysqlPacket):
+    def _read_packet(self, packet_type=MysqlPacket, reuse_buffer=False):
         """Read an entire "mysql packet" in its entirety from the network
         and return a MysqlPacket type that represents the results.
 
+        With reuse_buffer=True the packet data is a memoryview of the
+        connection's receive buffer instead of a new bytes object. The next
+        reuse_buffer read overwrites it, so the caller must copy out what it
+        keeps before reading another packet (row decoding does).
+
         :raise OperationalError: If the connection to the MySQL server is lost.
         :raise InternalError: If the packet sequence number is wrong.
         """
-        buff = bytearray()
+        chunks = []
+        length = 0
         while True:
             packet_header = self._read_bytes(4)
             # if DEBUG: dump_packet(packet_header)
@@ -767,16 +783,30 @@ class Connection:
                 )
             self._next_seq_id = (self._next_seq_id + 1) % 256
 
-            recv_data = self._read_bytes(bytes_to_read)
-            if DEBUG:
-                dump_packet(recv_data)
-            buff += recv_data
+            if reuse_buffer:
+                self._read_bytes_into_buffer(length, bytes_to_read)
+            else:
+                chunks.append(self._read_bytes(bytes_to_read))
+            length += bytes_to_read
             # https://dev.mysql.com/doc/internals/en/sending-more-than-16mbyte.html
             if bytes_to_read < MAX_PACKET_LEN:
                 break
 
-        packet = packet_type(bytes(buff), self.encoding)
+        if reuse_buffer:
+            data = memoryview(self._recv_buffer)[:length]
+        elif len(chunks) == 1:
+            # Almost every packet fits in one chunk; use it without copying
+            data = chunks[0]
+        else:
+            data = b"".join(chunks)
+        if DEBUG:
+            dump_packet(data)
+
+        packet = packet_type(data, self.encoding)
         if packet.is_error_packet():
+            if reuse_buffer:
+                # The error is raised with the packet data, which must outlive the buffer
+                packet = packet_type(bytes(data), self.encoding)
             if self._result is not None and self._result.unbuffered_active is True:
                 self._result.unbuffered_active = False
             packet.raise_for_error()
@@ -807,6 +837,46 @@ class Connection:
             )
         return data
 
+    def _read_bytes_into_buffer(self, offset, num_bytes):
+        """Read num_bytes into the receive buffer at offset, growing it as needed."""
+        end = offset + num_bytes
+        buff = self._recv_buffer
+        if buff is None or len(buff) < end:
+            # Replace rather than resize: a bytearray with live memoryviews
+            # (the previous row's packet) cannot change size
+            grown = bytearray(max(end, RECV_BUFFER_SIZE, 2 * len(buff) if buff else 0))
+            if offset:
+                grown[:offset] = buff[:offset]
+            self._recv_buffer = buff = grown
+
+        self._sock.settimeout(self._read_timeout)
+        view = memoryview(buff)[offset:end]
+        received = 0
+        while True:
+            try:
+                # BufferedReader.readinto fills the view unless the socket closes
+                n = self._rfile.readinto(view[received:] if received else view)
+            except OSError as e:
+                if e.errno == errno.EINTR:
+                    continue
+                self._force_close()
+                raise err.OperationalError(
+                    CR.CR_SERVER_LOST,
+                    f"Lost connection to MySQL server during query ({e})",
+                )
+            except BaseException:
+                # Don't convert unknown exception to MySQLError.
+                self._force_close()
+                raise
+            if not n:
+                self._force_close()
+                raise err.OperationalError(
+                    CR.CR_SERVER_LOST, "Lost connection to MySQL server during query"
+                )
+            received += n
+            if received >= num_bytes:
+                return
+
     def _write_bytes(self, data):
         self._sock.settimeout(self._write_timeout)
         try:
@@ -1292,7 +1362,7 @@ class MySQLResult:
             return
 
         # EOF
-        packet = self.connection._read_packet()
+        packet = self.connection._read_packet(reuse_buffer=True)
         if self._check_packet_is_eof(packet):
             self.unbuffered_active = False
             self.connection = None
@@ -1310,7 +1380,7 @@ class MySQLResult:
         # executing a query, so we just spin, and wait for an EOF packet.
         while self.unbuffered_active:
             try:
-                packet = self.connection._read_packet()
+                packet = self.connection._read_packet(reuse_buffer=True)
             except err.OperationalError as e:
                 if e.args[0] in (
                     ER.QUERY_TIMEOUT,
@@ -1331,7 +1401,7 @@ class MySQLResult:
         """Read a rowdata packet for each data row in the result set."""
         rows = []
         while True:
-            packet = self.connection._read_packet()
+            packet = self.connection._read_packet(reuse_buffer=True)
             if self._check_packet_is_eof(packet):
                 self.connection = None  # release reference to kill cyclic reference.
                 break
@@ -1341,22 +1411,66 @@ class MySQLResult:
         self.rows = tuple(rows)
 
     def _read_row_from_packet(self, packet):
+        """Decode one rowdata packet with the plan built by _get_descriptions()."""
+        data = packet.get_all_data()
+        end = len(data)
+        pos = 0
         row = []
-        for encoding, converter in self.converters:
-            try:
-                data = packet.read_length_coded_string()
-            except IndexError:
+        append = row.append
+        for run, decode in self._row_plan:
+            if pos >= end:
                 # No more columns in this row
                 # See https://github.com/PyMySQL/PyMySQL/pull/434
                 break
-            if data is not None:
-                if encoding is not None:
-                    data = data.decode(encoding)
-                if DEBUG:
-                    print("DEBUG: DATA = ", data)
-                if converter is not None:
-                    data = converter(data)
-            row.append(data)
+
+            if run:
+                # A run of integer columns: copy the (at most 21 bytes per
+                # column) span once and parse every value out of that copy
+                chunk = bytes(data[pos : pos + _MAX_INT_COLUMN * run])
+                size = len(chunk)
+                i = 0
+                for _ in range(run):
+                    if i >= size:
+                        break
+                    length = chunk[i]
+                    if length == NULL_COLUMN:
+                        append(None)
+                        i += 1
+                        continue
+                    if length > NULL_COLUMN or i + 1 + length > size:
+                        raise err.InternalError("Malformed integer column in row packet")
+                    append(int(chunk[i + 1 : i + 1 + length]))
+                    i += 1 + length
+                pos += i
+                continue
+
+            length = data[pos]
+            if length < NULL_COLUMN:
+                pos += 1
+            elif length == NULL_COLUMN:
+                append(None)
+                pos += 1
+                continue
+            elif length == UNSIGNED_SHORT_COLUMN:
+                length = data[pos + 1] | data[pos + 2] << 8
+                pos += 3
+            elif length == UNSIGNED_INT24_COLUMN:
+                length = data[pos + 1] | data[pos + 2] << 8 | data[pos + 3] << 16
+                pos += 4
+            else:
+                length = int.from_bytes(data[pos + 1 : pos + 9], "little")
+                pos += 9
+            if pos + length > end:
+                raise AssertionError(
+                    f"Result length not requested length: Expected={length}. Position: {pos}. Data Length: {end}"
+                )
+            # Row packets are views of the receive buffer: decoding (or
+            # bytes() for binary columns) is the only copy of the value
+            append(decode(data[pos : pos + length]))
+            pos += length
+
+        if DEBUG:
+            print("DEBUG: ROW = ", row)
         return tuple(row)
 
     def _get_descriptions(self):
@@ -1401,6 +1515,71 @@ class MySQLResult:
         eof_packet = self.connection._read_packet()
         assert eof_packet.is_eof_packet(), "Protocol error, expecting EOF"
         self.description = tuple(description)
+        self._row_plan = _build_row_plan(self.fields, self.converters)
+
+
+# Longest integer column on the wire: length byte plus 20 digits/sign
+_MAX_INT_COLUMN = 21
+
+
+def _decode_datetime(value, converter=converters.convert_datetime):
+    text = str(value, "ascii")
+    # Plain 'YYYY-MM-DD HH:MM:SS[.ffffff]' parses in C; zero dates and
+    # anything unusual go through the regular converter
+    if len(text) == 19 or len(text) == 26:
+        try:
+            return datetime.datetime.fromisoformat(text)
+        except ValueError:
+            pass
+    return converter(text)
+
+
+def _decode_date(value, converter=converters.convert_date):
+    text = str(value, "ascii")
+    if len(text) == 10:
+        try:
+            return datetime.date.fromisoformat(text)
+        except ValueError:
+            pass
+    return converter(text)
+
+
+def _column_decoder(field, encoding, converter):
+    """Return a function turning one column's raw value into its Python value."""
+    if encoding == "ascii":
+        if converter is converters.convert_datetime and field.type_code in (
+            FIELD_TYPE.DATETIME,
+            FIELD_TYPE.TIMESTAMP,
+        ):
+            return _decode_datetime
+        if converter is converters.convert_date and field.type_code == FIELD_TYPE.DATE:
+            return _decode_date
+    if encoding is None:
+        if converter is None:
+            return bytes
+        return lambda value: converter(bytes(value))
+    decode = functools.partial(str, encoding=encoding)
+    if converter is None:
+        return decode
+    return lambda value: converter(decode(value))
+
+
+def _build_row_plan(fields, column_converters):
+    """Group a result's columns into decoding steps, built once per result set.
+
+    Each step is (run, decode): run > 0 for that many consecutive integer
+    columns decoded together, or run == 0 and decode for a single column.
+    """
+    plan = []
+    for field, (encoding, converter) in zip(fields, column_converters):
+        if converter is int and encoding in ("ascii", None):
+            if plan and plan[-1][0]:
+                plan[-1] = (plan[-1][0] + 1, None)
+            else:
+                plan.append((1, None))
+        else:
+            plan.append((0, _column_decoder(field, encoding, converter)))
+    return tuple(plan)
 
 
 class LoadLocalFile:
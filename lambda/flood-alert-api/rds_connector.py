@@ -1,11 +1,20 @@
 import pymysql
 import os
+import time
 import logging
+from pymysql.constants import SERVER_STATUS
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Seconds a warm connection may sit idle before it is pinged again
+RDS_PING_INTERVAL = float(os.environ.get('RDS_PING_INTERVAL', '30'))
+
+# Module-level state survives across warm Lambda invocations
+_warm_connection = None
+_warm_connection_used_at = 0.0
+
 def get_rds_connection():
     """Connect to AWS RDS MySQL database"""
     try:
@@ -28,52 +37,107 @@ def get_rds_connection():
         logger.error(f"RDS connection failed: {e}")
         raise
 
+def get_warm_connection():
+    """Return the container-wide RDS connection, reconnecting only when it is stale or dead"""
+    global _warm_connection, _warm_connection_used_at
+
+    now = time.monotonic()
+
+    if _warm_connection is None or not _warm_connection.open:
+        _warm_connection = get_rds_connection()
+    elif now - _warm_connection_used_at > RDS_PING_INTERVAL:
+        try:
+            # Reconnects in place if RDS or a NAT timed the socket out
+            _warm_connection.ping(reconnect=True)
+        except Exception as e:
+            logger.warning(f"Warm connection ping failed, reconnecting: {e}")
+            discard_warm_connection()
+            _warm_connection = get_rds_connection()
+
+    # release_connection ends every transaction; this only catches a caller
+    # that skipped it, so the request starts from a clean slate
+    if _warm_connection.server_status & SERVER_STATUS.SERVER_STATUS_IN_TRANS:
+        _warm_connection.rollback()
+
+    _warm_connection_used_at = now
+    return _warm_connection
+
+def release_connection(connection, failed=False):
+    """Hand a warm connection back after a request, ending any open transaction"""
+    global _warm_connection_used_at
+
+    # With autocommit off even a plain SELECT opens a transaction; left open
+    # while the container is frozen it would hold a read view and metadata
+    # locks that block DDL (CREATE INDEX, ALTER TABLE) and everything queued
+    # behind it. Successful writes have committed already, so this only
+    # ends read-only transactions or undoes a failed request
+    if failed or connection.server_status & SERVER_STATUS.SERVER_STATUS_IN_TRANS:
+        try:
+            connection.rollback()
+        except Exception as e:
+            # The socket is unusable; the next request will reconnect
+            logger.warning(f"Rollback failed, dropping warm connection: {e}")
+            discard_warm_connection()
+            return
+
+    _warm_connection_used_at = time.monotonic()
+
+def discard_warm_connection():
+    """Close and forget the warm connection"""
+    global _warm_connection
+
+    if _warm_connection is not None:
+        try:
+            _warm_connection.close()
+        except Exception:
+            pass
+    _warm_connection = None
+
 def execute_query(query, params=None):
     """Execute query and return results"""
-    connection = get_rds_connection()
+    connection = get_warm_connection()
     try:
         with connection.cursor() as cursor:
             cursor.execute(query, params)
             if query.strip().upper().startswith(('INSERT', 'UPDATE', 'DELETE')):
                 connection.commit()
-                return cursor.rowcount
-            return cursor.fetchall()
+                result = cursor.rowcount
+            else:
+                result = cursor.fetchall()
+        release_connection(connection)
+        return result
     except Exception as e:
-        connection.rollback()
+        release_connection(connection, failed=True)
         logger.error(f"Query execution failed: {e}")
         raise
-    finally:
-        connection.close()
 
 def execute_insert(query, params=None):
     """Execute insert query and return inserted ID"""
-    connection = get_rds_connection()
+    connection = get_warm_connection()
     try:
         with connection.cursor() as cursor:
             cursor.execute(query, params)
             connection.commit()
             inserted_id = cursor.lastrowid
-            logger.info(f"Insert successful, ID: {inserted_id}")
-            return inserted_id
+        release_connection(connection)
+        logger.info(f"Insert successful, ID: {inserted_id}")
+        return inserted_id
     except Exception as e:
-        connection.rollback()
+        release_connection(connection, failed=True)
         logger.error(f"Insert failed: {e}")
         raise
-    finally:
-        connection.close()
 
 def test_connection():
     """Test RDS connection"""
     try:
-        connection = get_rds_connection()
+        connection = get_warm_connection()
         with connection.cursor() as cursor:
             cursor.execute("SELECT 1")
             result = cursor.fetchone()
-            logger.info("RDS connection test successful")
-            return True
+        release_connection(connection)
+        logger.info("RDS connection test successful")
+        return True
     except Exception as e:
         logger.error(f"RDS connection test failed: {e}")
+        discard_warm_connection()
         return False
-    finally:
-        if 'connection' in locals():
-            connection.close()
\ No newline at end of file